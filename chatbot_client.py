@@ -3,41 +3,122 @@ Example client for the AI Chatbot API
 Demonstrates how to interact with the chatbot programmatically
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import httpx
 import json
-from typing import Optional
 import time
+from typing import Iterator, List, Optional
+
+# HTTP/2 multiplexing is optional (pip install 'httpx[http2]')
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Rust-backed JSON encoding is optional (pip install orjson)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data) -> bytes:
+    """Encode a request payload as JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _loads(content: bytes):
+    """Decode a JSON response body"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Longest single wait honoured from a Retry-After header
+MAX_RETRY_AFTER = 30.0
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """Seconds to wait from a Retry-After header (1s if missing or a date, capped at MAX_RETRY_AFTER)"""
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return 1.0
 
 
 class ChatbotClient:
     """Client for interacting with the AI Chatbot API"""
     
+    # Attempts per request while the server keeps answering 429
+    MAX_THROTTLE_RETRIES = 5
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip('/')
         self.session_id: Optional[str] = None
+        
+        # Reuse one keep-alive connection pool across all API calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "User-Agent": "ChatbotClient/1.0",
+        })
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, waiting out 429 responses for as long as Retry-After asks"""
+        for attempt in range(self.MAX_THROTTLE_RETRIES):
+            response = self._session.request(method, url, **kwargs)
+            # No point waiting after the last attempt: the 429 is raised below
+            if response.status_code != 429 or attempt == self.MAX_THROTTLE_RETRIES - 1:
+                break
+            time.sleep(_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+        return response
     
     def create_session(self, title: str = "") -> dict:
         """Create a new chat session"""
-        response = requests.post(
+        response = self._send(
+            "POST",
             f"{self.base_url}/api/sessions/",
-            json={"title": title}
+            data=_dumps({"title": title})
         )
-        response.raise_for_status()
-        session = response.json()
+        session = _loads(response.content)
         self.session_id = session['id']
         print(f"Created session: {self.session_id}")
         return session
     
     def list_sessions(self) -> list:
         """List all chat sessions"""
-        response = requests.get(f"{self.base_url}/api/sessions/")
-        response.raise_for_status()
-        return response.json()
+        response = self._send("GET", f"{self.base_url}/api/sessions/")
+        return _loads(response.content)
     
     def get_session(self, session_id: str) -> dict:
         """Get session details with messages"""
-        response = requests.get(f"{self.base_url}/api/sessions/{session_id}/")
-        response.raise_for_status()
-        return response.json()
+        response = self._send("GET", f"{self.base_url}/api/sessions/{session_id}/")
+        return _loads(response.content)
     
     def chat(self, message: str, session_id: Optional[str] = None) -> dict:
         """Send a message to the chatbot"""
@@ -47,27 +128,122 @@ class ChatbotClient:
         if session_id is None:
             raise ValueError("No session ID provided. Create a session first.")
         
-        response = requests.post(
+        response = self._send(
+            "POST",
             f"{self.base_url}/api/chat/",
-            json={
+            data=_dumps({
                 "message": message,
                 "session_id": session_id
-            }
+            })
         )
-        response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
+    
+    def chat_stream(self, message: str, session_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Send a message and yield the response text as it is generated
+        
+        Args:
+            message: User message
+            session_id: Session to post to (defaults to the current session)
+            
+        Yields:
+            Chunks of the assistant's answer, in order
+        """
+        if session_id is None:
+            session_id = self.session_id
+        
+        if session_id is None:
+            raise ValueError("No session ID provided. Create a session first.")
+        
+        # httpx yields lines as soon as bytes arrive; requests' iter_lines
+        # blocks on a fixed read size (or EOF) before handing anything over
+        with httpx.stream(
+            "POST",
+            f"{self.base_url}/api/chat/stream/",
+            content=_dumps({
+                "message": message,
+                "session_id": session_id
+            }),
+            headers={**self._session.headers, "Accept": "text/event-stream"},
+            timeout=None,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = _loads(line[len("data: "):])
+                if 'error' in event:
+                    raise RuntimeError(event['error'])
+                if 'delta' in event:
+                    yield event['delta']
+    
+    async def chat_many(self, messages: List[str], session_id: Optional[str] = None) -> List[dict]:
+        """
+        Send several independent messages concurrently
+        
+        Requests are issued together over one connection; with HTTP/2 they
+        are multiplexed as separate streams instead of waiting on each other.
+        
+        Args:
+            messages: User messages to send
+            session_id: Session to post to (defaults to the current session)
+            
+        Returns:
+            List of chat responses, in the same order as ``messages``
+        """
+        if session_id is None:
+            session_id = self.session_id
+        
+        if session_id is None:
+            raise ValueError("No session ID provided. Create a session first.")
+        
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=HTTP2_AVAILABLE,
+            headers=dict(self._session.headers),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            timeout=None,
+        ) as client:
+            async def post(message: str) -> httpx.Response:
+                for attempt in range(self.MAX_THROTTLE_RETRIES):
+                    response = await client.post(
+                        "/api/chat/",
+                        content=_dumps({"message": message, "session_id": session_id})
+                    )
+                    if response.status_code != 429 or attempt == self.MAX_THROTTLE_RETRIES - 1:
+                        break
+                    await asyncio.sleep(_retry_after(response.headers.get("Retry-After")))
+                return response
+            
+            responses = await asyncio.gather(*[post(message) for message in messages])
+        
+        for response in responses:
+            response.raise_for_status()
+        return [_loads(response.content) for response in responses]
     
     def search(self, query: str, top_k: int = 5) -> list:
         """Search the codebase"""
-        response = requests.post(
+        response = self._send(
+            "POST",
             f"{self.base_url}/api/search/",
-            json={
+            data=_dumps({
                 "query": query,
                 "top_k": top_k
-            }
+            })
         )
-        response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
+    
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[list]:
+        """Search the codebase for several queries in one request"""
+        response = self._send(
+            "POST",
+            f"{self.base_url}/api/search/",
+            data=_dumps({
+                "queries": queries,
+                "top_k": top_k
+            })
+        )
+        return _loads(response.content)
     
     def start_indexing(self, root_path: Optional[str] = None, use_postgres: bool = True) -> dict:
         """Start indexing the codebase"""
@@ -75,21 +251,21 @@ class ChatbotClient:
         if root_path:
             data["root_path"] = root_path
         
-        response = requests.post(
+        response = self._send(
+            "POST",
             f"{self.base_url}/api/index/",
-            json=data
+            data=_dumps(data)
         )
-        response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def get_indexing_status(self, job_id: str) -> dict:
         """Get status of an indexing job"""
-        response = requests.get(
+        response = self._send(
+            "GET",
             f"{self.base_url}/api/index/",
             params={"job_id": job_id}
         )
-        response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def clear_history(self, session_id: Optional[str] = None) -> dict:
         """Clear chat history for a session"""
@@ -99,11 +275,20 @@ class ChatbotClient:
         if session_id is None:
             raise ValueError("No session ID provided")
         
-        response = requests.delete(
+        response = self._send(
+            "DELETE",
             f"{self.base_url}/api/sessions/{session_id}/clear_history/"
         )
-        response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
+    
+    def clear_histories(self, session_ids: List[str]) -> dict:
+        """Clear chat history for several sessions in one request"""
+        response = self._send(
+            "POST",
+            f"{self.base_url}/api/sessions/bulk_clear/",
+            data=_dumps({"session_ids": session_ids})
+        )
+        return _loads(response.content)
 
 
 def demo():
@@ -113,45 +298,49 @@ def demo():
     print("=" * 70)
     
     # Initialize client
-    client = ChatbotClient()
-    
-    # Create a new session
-    print("\n1. Creating new chat session...")
-    session = client.create_session(title="Demo Session")
-    print(f"   Session ID: {session['id']}")
-    
-    # Ask some questions
-    questions = [
-        "What is this project about?",
-        "What are the main services in this application?",
-        "How does the chat service work?",
-    ]
-    
-    print("\n2. Asking questions...")
-    for i, question in enumerate(questions, 1):
-        print(f"\n   Q{i}: {question}")
-        response = client.chat(question)
-        print(f"   A{i}: {response['message'][:200]}...")
-        
-        if response['sources']:
-            print(f"   Sources ({len(response['sources'])}):")
-            for source in response['sources'][:3]:  # Show first 3
-                print(f"      - {source['file_name']}")
-        
-        time.sleep(1)  # Be nice to the API
-    
-    # Search the codebase
-    print("\n3. Searching codebase...")
-    search_query = "authentication"
-    results = client.search(search_query, top_k=3)
-    print(f"   Found {len(results)} results for '{search_query}':")
-    for i, result in enumerate(results, 1):
-        print(f"   {i}. {result['metadata'].get('file_name', 'Unknown')} (score: {result['score']:.2f})")
-    
-    # List all sessions
-    print("\n4. Listing all sessions...")
-    sessions = client.list_sessions()
-    print(f"   Total sessions: {len(sessions)}")
+    with ChatbotClient() as client:
+        # Create a new session
+        print("\n1. Creating new chat session...")
+        session = client.create_session(title="Demo Session")
+        print(f"   Session ID: {session['id']}")
+        
+        # Ask some questions
+        questions = [
+            "What is this project about?",
+            "What are the main services in this application?",
+            "How does the chat service work?",
+        ]
+        
+        print("\n2. Asking questions...")
+        responses = asyncio.run(client.chat_many(questions))
+        for i, (question, response) in enumerate(zip(questions, responses), 1):
+            print(f"\n   Q{i}: {question}")
+            print(f"   A{i}: {response['message'][:200]}...")
+        
+            if response['sources']:
+                print(f"   Sources ({len(response['sources'])}):")
+                for source in response['sources'][:3]:  # Show first 3
+                    print(f"      - {source.get('file_name') or source.get('file_path', '?')}")
+        
+        # Stream a follow-up answer token by token
+        print("\n3. Streaming a follow-up answer...")
+        print("   A: ", end="", flush=True)
+        for token in client.chat_stream("Which file should I read first?"):
+            print(token, end="", flush=True)
+        print()
+        
+        # Search the codebase
+        print("\n4. Searching codebase...")
+        search_query = "authentication"
+        results = client.search(search_query, top_k=3)
+        print(f"   Found {len(results)} results for '{search_query}':")
+        for i, result in enumerate(results, 1):
+            print(f"   {i}. {result['metadata'].get('file_name', 'Unknown')} (score: {result['score']:.2f})")
+        
+        # List all sessions
+        print("\n5. Listing all sessions...")
+        sessions = client.list_sessions()
+        print(f"   Total sessions: {len(sessions)}")
     
     print("\n" + "=" * 70)
     print("DEMO COMPLETE")
@@ -161,7 +350,7 @@ def demo():
 if __name__ == "__main__":
     try:
         demo()
-    except requests.exceptions.ConnectionError:
+    except (requests.exceptions.ConnectionError, httpx.ConnectError):
         print("ERROR: Could not connect to the server.")
         print("Make sure the Django server is running:")
         print("  python src/manage.py runserver")
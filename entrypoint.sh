@@ -31,6 +31,7 @@ if [[ "$1" != *"celery"* ]]; then
     python manage.py collectstatic --noinput
 else
     echo "👷 Starting Celery Worker... (Skipping migrations)"
+    export DJANGO_IS_WEB=0
 fi
 
 echo "🔥 Starting Command: $@"
@@ -14,6 +14,13 @@ import json
 from typing import Any, Dict
 from pathlib import Path
 
+# Rust-backed JSON encoding is optional (pip install orjson)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     from mcp import ClientSession, StdioServerParameters
     from mcp.client.stdio import stdio_client
@@ -23,6 +30,20 @@ except ImportError:
     exit(1)
 
 
+def _pretty_json(data: Any) -> str:
+    """Format data as indented JSON for display"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
+def _loads(text: str) -> Any:
+    """Parse a JSON tool result"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 class MCPClient:
     """Client for interacting with the AI Documentation MCP server"""
     
@@ -86,7 +107,7 @@ class MCPClient:
             Tool response
         """
         print(f"\n🔧 Calling tool: {tool_name}")
-        print(f"   Arguments: {json.dumps(arguments, indent=2)}")
+        print(f"   Arguments: {_pretty_json(arguments)}")
         
         result = await self.session.call_tool(tool_name, arguments)
         
@@ -95,9 +116,9 @@ class MCPClient:
             for content in result.content:
                 if hasattr(content, 'text'):
                     try:
-                        parsed = json.loads(content.text)
+                        parsed = _loads(content.text)
                         print(f"\n✨ Result:")
-                        print(json.dumps(parsed, indent=2))
+                        print(_pretty_json(parsed))
                         return parsed
                     except json.JSONDecodeError:
                         print(f"\n✨ Result:\n{content.text}")
@@ -106,6 +127,51 @@ class MCPClient:
         return None
 
 
+async def index_and_chat(client: MCPClient):
+    """Index a codebase, then chat with it (each step depends on the last)"""
+    
+    # Example 1: Index a codebase
+    print("\n" + "=" * 60)
+    print("Example 1: Index Codebase")
+    print("=" * 60)
+    
+    await client.call_tool(
+        "index_codebase",
+        {
+            "path": "/path/to/your/project",  # Update this path
+            "use_postgres": True
+        }
+    )
+    
+    # Example 2: Chat with the codebase
+    print("\n" + "=" * 60)
+    print("Example 2: Chat with Codebase")
+    print("=" * 60)
+    
+    chat_result = await client.call_tool(
+        "chat_with_codebase",
+        {
+            "question": "What are the main components of this project?",
+            "use_postgres": True
+        }
+    )
+    
+    # Save session ID for follow-up questions
+    session_id = chat_result.get("session_id") if chat_result else None
+    
+    if session_id:
+        # Follow-up question in the same session
+        print("\n📝 Asking follow-up question...")
+        await client.call_tool(
+            "chat_with_codebase",
+            {
+                "question": "How do they interact with each other?",
+                "session_id": session_id,
+                "use_postgres": True
+            }
+        )
+
+
 async def example_workflow():
     """Example workflow demonstrating MCP capabilities"""
     
@@ -132,78 +198,31 @@ async def example_workflow():
         # Connect to server
         await client.connect()
         
-        # List available tools
-        await client.list_tools()
-        
-        # Example 1: Index a codebase
-        print("\n" + "=" * 60)
-        print("Example 1: Index Codebase")
-        print("=" * 60)
-        
-        index_result = await client.call_tool(
-            "index_codebase",
-            {
-                "path": "/path/to/your/project",  # Update this path
-                "use_postgres": True
-            }
-        )
-        
-        # Example 2: Chat with the codebase
-        print("\n" + "=" * 60)
-        print("Example 2: Chat with Codebase")
-        print("=" * 60)
-        
-        chat_result = await client.call_tool(
-            "chat_with_codebase",
-            {
-                "question": "What are the main components of this project?",
-                "use_postgres": True
-            }
-        )
-        
-        # Save session ID for follow-up questions
-        session_id = chat_result.get("session_id") if chat_result else None
-        
-        if session_id:
-            # Follow-up question in the same session
-            print("\n📝 Asking follow-up question...")
-            followup_result = await client.call_tool(
-                "chat_with_codebase",
+        # Examples 1-4 run concurrently: independent calls share the MCP
+        # session (JSON-RPC requests are matched by id), and the TaskGroup
+        # cancels the remaining calls if any of them fails.
+        # Example 3 analyzes the project, Example 4 searches for files.
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(client.list_tools())
+            tg.create_task(index_and_chat(client))
+            tg.create_task(client.call_tool(
+                "analyze_project",
                 {
-                    "question": "How do they interact with each other?",
-                    "session_id": session_id,
-                    "use_postgres": True
+                    "path": "/path/to/your/project",  # Update this path
+                    "max_depth": 5
                 }
-            )
-        
-        # Example 3: Analyze project structure
-        print("\n" + "=" * 60)
-        print("Example 3: Analyze Project")
-        print("=" * 60)
-        
-        analysis_result = await client.call_tool(
-            "analyze_project",
-            {
-                "path": "/path/to/your/project",  # Update this path
-                "max_depth": 5
-            }
-        )
-        
-        # Example 4: Search for files
-        print("\n" + "=" * 60)
-        print("Example 4: Search Codebase")
-        print("=" * 60)
-        
-        search_result = await client.call_tool(
-            "search_codebase",
-            {
-                "root_path": "/path/to/your/project",  # Update this path
-                "pattern": "*.py",
-                "max_depth": 5
-            }
-        )
+            ))
+            search_task = tg.create_task(client.call_tool(
+                "search_codebase",
+                {
+                    "root_path": "/path/to/your/project",  # Update this path
+                    "pattern": "*.py",
+                    "max_depth": 5
+                }
+            ))
         
-        # Example 5: Get file content
+        # Example 5: Get file content (depends on the search result)
+        search_result = search_task.result()
         if search_result and search_result.get("matches"):
             first_file = search_result["matches"][0]["path"]
             
@@ -3,6 +3,9 @@
 
 set -e
 
+# Non-web process: skip admin/WhiteNoise in Django settings
+export DJANGO_IS_WEB=0
+
 echo "🔧 MCP Server - Starting..."
 
 # Wait for database to be ready
@@ -21,14 +21,15 @@ if not api_key:
     sys.exit(1)
 
 # 2. Import
+import requests
 from langsmith import Client
 import langsmith
 print(f"langsmith {langsmith.__version__} imported OK")
 
-# 3. Create test run
-client = Client(api_key=api_key)
+# 3. Create test run (one keep-alive session for every API call)
+client = Client(api_key=api_key, session=requests.Session())
 rid = uuid.uuid4()
-now = datetime.now(timezone.utc)
+start = datetime.now(timezone.utc)
 
 print(f"\nCreating test run {rid}...")
 client.create_run(
@@ -37,12 +38,12 @@ client.create_run(
     id=rid,
     project_name=project,
     inputs={"tool": "test", "arguments": {"path": "/app"}},
-    start_time=now,
+    start_time=start,
 )
 client.update_run(
     run_id=rid,
     outputs={"result": "test OK"},
-    end_time=now,
+    end_time=datetime.now(timezone.utc),
 )
 print(f"DONE. Check LangSmith dashboard -> project: {project}")
 print("https://smith.langchain.com/")
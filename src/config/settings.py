@@ -10,14 +10,20 @@ env = environ.Env(
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Read .env file
-environ.Env.read_env(os.path.join(BASE_DIR, '../.env'))
+# Read .env file (if present); variables already set in the environment win
+ENV_PATH = BASE_DIR.parent / '.env'
+if ENV_PATH.exists():
+    environ.Env.read_env(ENV_PATH, overwrite=False)
 
 # 2. Security Settings
 SECRET_KEY = env('SECRET_KEY')
 DEBUG = env('DEBUG')
 ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=['localhost', '127.0.0.1'])
 
+# Celery workers and the MCP server set DJANGO_IS_WEB=0 so they skip
+# web-only apps, middleware and static file storage
+IS_WEB = env.bool('DJANGO_IS_WEB', default=True)
+
 # Production Security Settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -33,13 +39,12 @@ if not DEBUG:
 # 3. Application Definition
 INSTALLED_APPS = [
     'django_celery_results',
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'whitenoise.runserver_nostatic', # Dev support for static files
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third Party
     'rest_framework',
@@ -49,6 +54,11 @@ INSTALLED_APPS = [
     'core', 
 ]
 
+# Web-only apps
+if IS_WEB:
+    INSTALLED_APPS.insert(1, 'django.contrib.admin')
+    INSTALLED_APPS.insert(INSTALLED_APPS.index('django.contrib.staticfiles'), 'whitenoise.runserver_nostatic') # Dev support for static files
+
 # Development tools (only in DEBUG mode)
 if DEBUG:
     # Make django_extensions optional so workers without dev deps don't crash
@@ -70,8 +80,8 @@ if DEBUG:
         INSTALLED_APPS += ['debug_toolbar']
 
 MIDDLEWARE = [
+    'core.middleware.EventStreamGZipMiddleware', # Compress JSON API responses (not SSE)
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # Production Static Files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +90,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if IS_WEB:
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1, 'whitenoise.middleware.WhiteNoiseMiddleware') # Production Static Files
+
 # Development middleware
 if DEBUG:
     # Add debug toolbar middleware only if the package is available
@@ -112,12 +125,18 @@ DATABASES = {
     'default': env.db(),
 }
 
-# Connection pooling for production
-if not DEBUG:
-    DATABASES['default']['CONN_MAX_AGE'] = 600  # 10 minutes
-    DATABASES['default']['OPTIONS'] = {
-        'connect_timeout': 10,
-    }
+# Persistent connections (shorter-lived in development)
+DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60 if DEBUG else 600)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True  # Drop dead sockets before reuse
+DATABASES['default'].setdefault('OPTIONS', {}).update({
+    'connect_timeout': 10,
+    'application_name': env('DB_APPLICATION_NAME', default='docai'),
+})
+
+# Behind PgBouncer in transaction mode a session can change backends between
+# transactions, so named (server-side) cursors used by .iterator() can't work
+if env.bool('DB_PGBOUNCER', default=False):
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 
 # 5. Password Validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -136,7 +155,11 @@ USE_TZ = True
 # 7. Static Files
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+if IS_WEB:
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+    }
 
 # 8. Default Primary Key Field Type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -185,8 +208,28 @@ LOGGING = {
         'level': 'INFO',
     },
 }
+# Cache: DRF throttle history (and Celery's django-cache) live here. Point
+# CACHE_URL at the stack's Redis so every gunicorn worker shares one count;
+# without it each process keeps its own LocMemCache and the chat rate is
+# enforced per worker
+CACHE_URL = env('CACHE_URL', default=None)
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+    }
+
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
+    # Views with a throttle_scope answer 429 + Retry-After once the rate is used up
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.ScopedRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'chat': env('CHAT_THROTTLE_RATE', default='60/min'),
+    },
 }
@@ -19,10 +19,13 @@ from django.urls import path, include
 from django.conf import settings
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('core.urls')),
 ]
 
+# Admin is only installed in web processes (see IS_WEB in settings)
+if settings.IS_WEB:
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 # Debug toolbar (development only and only if installed)
 if settings.DEBUG and getattr(settings, 'DEBUG_TOOLBAR_AVAILABLE', False):
     urlpatterns += [path('__debug__/', include('debug_toolbar.urls'))]
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Substr
 from core.models import ChatSession, ChatMessage, Document, IndexingJob
 
 
@@ -18,9 +20,15 @@ class ChatMessageAdmin(admin.ModelAdmin):
     search_fields = ('content', 'session__id')
     readonly_fields = ('id', 'created_at')
     ordering = ('-created_at',)
+    list_per_page = 50
+    
+    def get_queryset(self, request):
+        # Truncate in SQL so the changelist never loads full message bodies
+        qs = super().get_queryset(request)
+        return qs.annotate(_preview=Substr('content', 1, 101)).defer('content')
     
     def message_preview(self, obj):
-        return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
+        return obj._preview[:100] + '...' if len(obj._preview) > 100 else obj._preview
     message_preview.short_description = 'Message Preview'
 
 
@@ -31,9 +39,15 @@ class DocumentAdmin(admin.ModelAdmin):
     search_fields = ('file_path', 'content')
     readonly_fields = ('id', 'created_at', 'updated_at')
     ordering = ('-created_at',)
+    list_per_page = 50
+    
+    def get_queryset(self, request):
+        # Truncate in SQL so the changelist never loads full documents
+        qs = super().get_queryset(request)
+        return qs.annotate(_preview=Substr('content', 1, 101)).defer('content', 'embedding')
     
     def content_preview(self, obj):
-        return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
+        return obj._preview[:100] + '...' if len(obj._preview) > 100 else obj._preview
     content_preview.short_description = 'Content Preview'
 
 
@@ -45,9 +59,18 @@ class IndexingJobAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'started_at', 'completed_at')
     ordering = ('-started_at',)
     
+    def get_queryset(self, request):
+        # Compute progress in SQL so the column can be sorted
+        qs = super().get_queryset(request)
+        return qs.annotate(_progress=Case(
+            When(total_files__gt=0, then=F('processed_files') * 100.0 / F('total_files')),
+            default=None,
+            output_field=FloatField(),
+        ))
+    
     def progress(self, obj):
-        if obj.total_files and obj.total_files > 0:
-            percentage = (obj.processed_files / obj.total_files) * 100
-            return f"{percentage:.1f}%"
+        if obj._progress is not None:
+            return f"{obj._progress:.1f}%"
         return "N/A"
     progress.short_description = 'Progress'
+    progress.admin_order_field = '_progress'
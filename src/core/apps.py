@@ -1,6 +1,16 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+    
+    def ready(self):
+        # Surface a missing key at boot instead of on the first chat request
+        if not settings.OPENAI_API_KEY:
+            logger.warning("OPENAI_API_KEY is not set; LLM and embedding calls will fail")
@@ -1,16 +1,117 @@
 """
 LLM Factory for creating LangChain and LlamaIndex providers
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+from functools import lru_cache
+import asyncio
 from django.conf import settings
 import os
 
+import httpx
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from llama_index.core import Settings
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.utils import get_tokenizer
 from llama_index.llms.openai import OpenAI as LlamaOpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 
+def _get_api_key() -> str:
+    """
+    Read the OpenAI API key, failing fast if it is missing
+    
+    The key is looked up on every call (a single dict lookup) rather than
+    frozen at import, so rotating it or patching the environment in tests
+    takes effect; it is then part of the client cache key.
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    return api_key
+
+
+@lru_cache(maxsize=1)
+def _get_http_client() -> httpx.Client:
+    """Shared HTTP connection pool for every cached OpenAI client"""
+    return httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+
+
+@lru_cache(maxsize=8)
+def _cached_text_splitter(chunk_size: int, chunk_overlap: int) -> SentenceSplitter:
+    # get_tokenizer() returns LlamaIndex's process-wide tiktoken (cl100k_base)
+    # encoder, loaded once from its bundled cache
+    return SentenceSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        tokenizer=get_tokenizer(),
+    )
+
+
+# Cached constructors: one long-lived client per (key, model, params) so the
+# connection pool is reused instead of rebuilt on every factory call. kwargs
+# arrives as (name, value) pairs: a frozenset key, or a tuple when uncached.
+
+@lru_cache(maxsize=32)
+def _cached_langchain_llm(api_key: str, model: str, temperature: float, kwargs: Iterable) -> ChatOpenAI:
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        openai_api_key=api_key,
+        http_client=_get_http_client(),
+        **dict(kwargs)
+    )
+
+
+@lru_cache(maxsize=32)
+def _cached_langchain_embeddings(api_key: str, model: str, kwargs: Iterable) -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        model=model,
+        openai_api_key=api_key,
+        http_client=_get_http_client(),
+        **dict(kwargs)
+    )
+
+
+@lru_cache(maxsize=32)
+def _cached_llama_index_llm(api_key: str, model: str, temperature: float, kwargs: Iterable) -> LlamaOpenAI:
+    return LlamaOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=api_key,
+        http_client=_get_http_client(),
+        **dict(kwargs)
+    )
+
+
+@lru_cache(maxsize=32)
+def _cached_llama_index_embeddings(api_key: str, model: str, kwargs: Iterable) -> OpenAIEmbedding:
+    return OpenAIEmbedding(
+        model=model,
+        api_key=api_key,
+        http_client=_get_http_client(),
+        **dict(kwargs)
+    )
+
+
+def _client(cached, *args, kwargs: Dict[str, Any]):
+    """
+    Call a cached constructor with kwargs frozen into its cache key
+    
+    Unhashable values (model_kwargs={...}, default_headers={...},
+    callbacks=[...]) can't be part of a key; those calls build an uncached
+    client, as the factory did before caching.
+    """
+    items = tuple(kwargs.items())
+    try:
+        key = frozenset(items)
+    except TypeError:
+        return cached.__wrapped__(*args, items)
+    return cached(*args, key)
+
+
 class LLMFactory:
     """Factory for creating LLM instances"""
     
@@ -29,22 +130,15 @@ class LLMFactory:
             **kwargs: Additional parameters
             
         Returns:
-            ChatOpenAI instance
+            ChatOpenAI instance (cached per argument set)
         """
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        return ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            openai_api_key=api_key,
-            **kwargs
-        )
+        return _client(_cached_langchain_llm, _get_api_key(), model, temperature, kwargs=kwargs)
     
     @staticmethod
     def get_langchain_embeddings(
         model: str = "text-embedding-3-small",
+        chunk_size: int = 512,
+        max_retries: int = 6,
         **kwargs
     ) -> OpenAIEmbeddings:
         """
@@ -52,20 +146,45 @@ class LLMFactory:
         
         Args:
             model: Embedding model name
+            chunk_size: Number of texts sent per embeddings request
+            max_retries: Retries on transient API errors
             **kwargs: Additional parameters
             
         Returns:
-            OpenAIEmbeddings instance
+            OpenAIEmbeddings instance (cached per argument set)
         """
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        kwargs.update(chunk_size=chunk_size, max_retries=max_retries)
+        return _client(_cached_langchain_embeddings, _get_api_key(), model, kwargs=kwargs)
+    
+    @staticmethod
+    async def embed_texts_async(
+        texts: List[str],
+        batch_size: int = 256,
+        concurrency: int = 8,
+        model: str = "text-embedding-3-small",
+    ) -> List[List[float]]:
+        """
+        Embed many texts with batched, concurrent API requests
         
-        return OpenAIEmbeddings(
-            model=model,
-            openai_api_key=api_key,
-            **kwargs
-        )
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts per request
+            concurrency: Maximum number of requests in flight
+            model: Embedding model name
+            
+        Returns:
+            One embedding vector per input text, in input order
+        """
+        embeddings = LLMFactory.get_langchain_embeddings(model=model, chunk_size=batch_size)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await embeddings.aembed_documents(batch)
+        
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [vector for batch in results for vector in batch]
     
     @staticmethod
     def get_llama_index_llm(
@@ -82,18 +201,9 @@ class LLMFactory:
             **kwargs: Additional parameters
             
         Returns:
-            LlamaOpenAI instance
+            LlamaOpenAI instance (cached per argument set)
         """
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        return LlamaOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=api_key,
-            **kwargs
-        )
+        return _client(_cached_llama_index_llm, _get_api_key(), model, temperature, kwargs=kwargs)
     
     @staticmethod
     def get_llama_index_embeddings(
@@ -108,24 +218,36 @@ class LLMFactory:
             **kwargs: Additional parameters
             
         Returns:
-            OpenAIEmbedding instance
+            OpenAIEmbedding instance (cached per argument set)
+        """
+        return _client(_cached_llama_index_embeddings, _get_api_key(), model, kwargs=kwargs)
+    
+    @staticmethod
+    def get_fast_text_splitter(
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+    ) -> SentenceSplitter:
         """
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        Get the shared sentence splitter backed by the tiktoken encoder
         
-        return OpenAIEmbedding(
-            model=model,
-            api_key=api_key,
-            **kwargs
+        Args:
+            chunk_size: Tokens per chunk (defaults to LLMConfig.DEFAULT_CHUNK_SIZE)
+            chunk_overlap: Token overlap (defaults to LLMConfig.DEFAULT_CHUNK_OVERLAP)
+            
+        Returns:
+            SentenceSplitter instance (one per chunk configuration)
+        """
+        return _cached_text_splitter(
+            chunk_size or LLMConfig.DEFAULT_CHUNK_SIZE,
+            chunk_overlap if chunk_overlap is not None else LLMConfig.DEFAULT_CHUNK_OVERLAP,
         )
     
     @staticmethod
     def configure_llama_index_settings(
         llm_model: str = "gpt-4",
         embed_model: str = "text-embedding-3-small",
-        chunk_size: int = 1024,
-        chunk_overlap: int = 200,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
     ):
         """
         Configure global LlamaIndex settings
@@ -133,13 +255,15 @@ class LLMFactory:
         Args:
             llm_model: LLM model name
             embed_model: Embedding model name
-            chunk_size: Size of text chunks
-            chunk_overlap: Overlap between chunks
+            chunk_size: Size of text chunks (defaults to LLMConfig.DEFAULT_CHUNK_SIZE)
+            chunk_overlap: Overlap between chunks (defaults to LLMConfig.DEFAULT_CHUNK_OVERLAP)
         """
         Settings.llm = LLMFactory.get_llama_index_llm(model=llm_model)
-        Settings.embed_model = LLMFactory.get_llama_index_embeddings(model=embed_model)
-        Settings.chunk_size = chunk_size
-        Settings.chunk_overlap = chunk_overlap
+        Settings.embed_model = LLMFactory.get_llama_index_embeddings(
+            model=embed_model,
+            embed_batch_size=LLMConfig.DEFAULT_EMBED_BATCH_SIZE,
+        )
+        Settings.node_parser = LLMFactory.get_fast_text_splitter(chunk_size, chunk_overlap)
 
 
 class LLMConfig:
@@ -155,9 +279,10 @@ class LLMConfig:
     CREATIVE_TEMPERATURE = 0.9
     PRECISE_TEMPERATURE = 0.2
     
-    # Chunking parameters - small chunks to stay under rate limits
-    DEFAULT_CHUNK_SIZE = 256  # Small chunks to reduce token count per embedding
-    DEFAULT_CHUNK_OVERLAP = 50  # Minimal overlap
+    # Chunking parameters - shared by every splitter so chunks are consistent
+    DEFAULT_CHUNK_SIZE = 512  # Tokens per chunk
+    DEFAULT_CHUNK_OVERLAP = 64  # Tokens shared between neighbouring chunks
+    DEFAULT_EMBED_BATCH_SIZE = 256  # Texts per embeddings request
     
     # Retrieval parameters
     DEFAULT_TOP_K = 5
@@ -1,19 +1,130 @@
 """
 Vector store providers for LangChain and LlamaIndex
 """
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Callable, Dict, Tuple
+import csv
+import functools
+import io
+import json
 import os
+import threading
 from pathlib import Path
 
 from llama_index.core import VectorStoreIndex, StorageContext
-from llama_index.core.schema import Document as LlamaDocument
+from llama_index.core.schema import BaseNode, Document as LlamaDocument, MetadataMode
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
 from llama_index.vector_stores.postgres import PGVectorStore
+from llama_index.vector_stores.postgres.base import DBEmbeddingRow
 from llama_index.vector_stores.redis import RedisVectorStore
+from llama_index.vector_stores.redis.schema import RedisVectorStoreSchema
 
 from langchain_community.vectorstores import Redis as LangChainRedis
 from langchain_community.vectorstores.pgvector import PGVector
 
 import redis
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+
+
+def _vector_to_db(value: Any, dim: Optional[int] = None) -> Optional[str]:
+    """
+    Encode an embedding as a pgvector text literal
+    
+    '[x,y,...]' is also valid JSON, so lists are handed to the C JSON
+    encoder instead of pgvector's per-float str() join. numpy arrays are
+    accepted too; pgvector's psycopg2 register_vector() adapter would not
+    help here, as psycopg2 only speaks the text protocol and that adapter
+    performs the same str() join.
+    
+    Args:
+        value: List, tuple, numpy array or pgvector Vector/HalfVector
+        dim: Expected number of dimensions, if known
+        
+    Returns:
+        Text literal, or None for NULL
+        
+    Raises:
+        ValueError: If value does not have dim dimensions
+    """
+    if value is None:
+        return None
+    if hasattr(value, 'tolist'):
+        value = value.tolist()
+    elif not isinstance(value, (list, tuple)):
+        value = value.to_list()
+    if dim is not None and len(value) != dim:
+        raise ValueError('expected %d dimensions, not %d' % (dim, len(value)))
+    return json.dumps(value)
+
+
+class _JsonVector(VECTOR):
+    """VECTOR column that binds embeddings through _vector_to_db"""
+    
+    cache_ok = True
+    
+    def bind_processor(self, dialect):
+        dim = self.dim
+        return lambda value: _vector_to_db(value, dim)
+
+
+class _JsonHalfVector(HALFVEC):
+    """HALFVEC column that binds embeddings through _vector_to_db"""
+    
+    cache_ok = True
+    
+    def bind_processor(self, dialect):
+        dim = self.dim
+        return lambda value: _vector_to_db(value, dim)
+
+
+def _use_json_vector_columns(model: Any) -> None:
+    """
+    Switch the pgvector columns of a store's model to the JSON-encoding types
+    
+    Runs right after the store builds its model and before any statement is
+    compiled, so inserts and distance queries pick up the new bind
+    processor. halfvec takes the same '[x,y,...]' text form.
+    """
+    for column in model.__table__.columns:
+        column_type = type(column.type)
+        if column_type is VECTOR:
+            column.type = _JsonVector(column.type.dim)
+        elif column_type is HALFVEC:
+            column.type = _JsonHalfVector(column.type.dim)
+
+
+def _redis_url() -> str:
+    """Redis URL from REDIS_HOST/REDIS_PORT/REDIS_PASSWORD"""
+    redis_host = os.getenv('REDIS_HOST', 'localhost')
+    redis_port = int(os.getenv('REDIS_PORT', '6379'))
+    redis_password = os.getenv('REDIS_PASSWORD', '')
+    
+    return (
+        f"redis://:{redis_password}@{redis_host}:{redis_port}" if redis_password 
+        else f"redis://{redis_host}:{redis_port}"
+    )
+
+
+# Store instances keyed by everything that went into building them
+_stores: Dict[Tuple, Any] = {}
+_stores_lock = threading.Lock()
+
+
+def _cached_store(key: Tuple, factory: Callable[[], Any]) -> Any:
+    """Return the store cached under key, building it on first use"""
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = factory()
+        return _stores[key]
+
+
+@functools.lru_cache(maxsize=None)
+def _redis_pool(redis_url: str) -> redis.ConnectionPool:
+    """Process-wide connection pool for a Redis URL"""
+    return redis.ConnectionPool.from_url(
+        redis_url,
+        max_connections=VectorStoreConfig.REDIS_MAX_CONNECTIONS,
+    )
 
 
 class VectorStoreProvider:
@@ -23,7 +134,8 @@ class VectorStoreProvider:
     def get_postgres_vector_store(
         table_name: str = "embeddings",
         embed_dim: int = 1536,
-        schema_name: str = "public"
+        schema_name: str = "public",
+        use_halfvec: Optional[bool] = None
     ) -> PGVectorStore:
         """
         Create a LlamaIndex PostgreSQL vector store
@@ -32,31 +144,256 @@ class VectorStoreProvider:
             table_name: Name of the table for vectors
             embed_dim: Dimension of embeddings (1536 for OpenAI)
             schema_name: PostgreSQL schema name
+            use_halfvec: Store FP16 halfvec instead of FP32 vector
+                (defaults to VectorStoreConfig.POSTGRES_USE_HALFVEC)
             
         Returns:
             PGVectorStore instance
         """
-        # Get database connection details from environment
+        # Get database connection details from environment. DB_HOST/DB_PORT
+        # may point at PgBouncer: psycopg2 never uses server-side prepared
+        # statements, so transaction pooling needs no extra URL options.
         db_host = os.getenv('DB_HOST', 'db')
         db_port = os.getenv('DB_PORT', '5432')
         db_name = os.getenv('DB_NAME', 'ai_analyst')
         db_user = os.getenv('DB_USER', 'postgres')
         db_password = os.getenv('DB_PASSWORD', 'password')
         
+        if use_halfvec is None:
+            use_halfvec = VectorStoreConfig.POSTGRES_USE_HALFVEC
+        
         # Use individual parameters instead of connection_string
-        # to avoid port parsing issues in LlamaIndex
-        return PGVectorStore.from_params(
-            host=db_host,
-            port=db_port,
-            database=db_name,
-            user=db_user,
-            password=db_password,
-            table_name=table_name,
-            embed_dim=embed_dim,
-            schema_name=schema_name,
-            perform_setup=True,
+        # to avoid port parsing issues in LlamaIndex.
+        # Setup only creates the table: the HNSW index is built once after
+        # a bulk load (create_hnsw_index) rather than maintained per insert.
+        def build() -> PGVectorStore:
+            store = PGVectorStore.from_params(
+                host=db_host,
+                port=db_port,
+                database=db_name,
+                user=db_user,
+                password=db_password,
+                table_name=table_name,
+                embed_dim=embed_dim,
+                schema_name=schema_name,
+                use_halfvec=use_halfvec,
+                perform_setup=True,
+                hnsw_kwargs=None,
+            )
+            _use_json_vector_columns(store._table_class)
+            return store
+        
+        return _cached_store(
+            ('llama_postgres', db_host, db_port, db_name, db_user, db_password,
+             table_name, embed_dim, schema_name, use_halfvec),
+            build,
         )
     
+    @staticmethod
+    def create_hnsw_index(
+        vector_store: PGVectorStore,
+        m: int = 16,
+        ef_construction: int = 64
+    ) -> str:
+        """
+        Build the HNSW index on a loaded LlamaIndex PostgreSQL store
+        
+        Uses CREATE INDEX CONCURRENTLY so searches keep working while it
+        builds; does nothing if a valid index already exists. An invalid one,
+        left behind by a failed or cancelled build, is dropped and rebuilt.
+        
+        Args:
+            vector_store: Store returned by get_postgres_vector_store()
+            m: Max connections per graph node
+            ef_construction: Candidate list size while building
+            
+        Returns:
+            Name of the index
+        """
+        vector_store._initialize()
+        table = vector_store._table_class.__table__
+        index_name = f"{table.name}_embedding_hnsw_idx"
+        ops = 'halfvec_cosine_ops' if vector_store.use_halfvec else 'vector_cosine_ops'
+        
+        # CONCURRENTLY cannot run inside a transaction block
+        with vector_store.client.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            # Refresh stats after the load, then give the build room to keep
+            # the graph in memory and to use parallel workers (session-level,
+            # so not through PgBouncer, where it would leak to other clients)
+            connection.exec_driver_sql(f'VACUUM (ANALYZE) "{table.schema}"."{table.name}"')
+            if not VectorStoreConfig.POSTGRES_BEHIND_PGBOUNCER:
+                connection.exec_driver_sql(
+                    "SELECT set_config('maintenance_work_mem', %s, false), "
+                    "set_config('max_parallel_maintenance_workers', %s, false)",
+                    (
+                        VectorStoreConfig.POSTGRES_MAINTENANCE_WORK_MEM,
+                        str(VectorStoreConfig.POSTGRES_MAINTENANCE_WORKERS),
+                    ),
+                )
+            try:
+                # IF NOT EXISTS would accept the INVALID index a failed
+                # concurrent build leaves under this name as done
+                invalid = connection.exec_driver_sql(
+                    "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                    (f'"{table.schema}"."{index_name}"',),
+                ).scalar()
+                if invalid:
+                    connection.exec_driver_sql(
+                        f'DROP INDEX CONCURRENTLY IF EXISTS "{table.schema}"."{index_name}"'
+                    )
+                connection.exec_driver_sql(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" '
+                    f'ON "{table.schema}"."{table.name}" '
+                    f'USING hnsw (embedding {ops}) '
+                    f'WITH (m = {int(m)}, ef_construction = {int(ef_construction)})'
+                )
+            finally:
+                connection.exec_driver_sql('RESET maintenance_work_mem; RESET max_parallel_maintenance_workers')
+        
+        return index_name
+    
+    @staticmethod
+    def bulk_insert_nodes(vector_store: PGVectorStore, nodes: List[BaseNode]) -> List[str]:
+        """
+        Write embedded nodes to a LlamaIndex PostgreSQL store with one COPY
+        
+        Produces the same rows as PGVectorStore.add(), which issues one
+        INSERT per node, so the store reads them back unchanged.
+        
+        Args:
+            vector_store: Store returned by get_postgres_vector_store()
+            nodes: Nodes whose embeddings are already set
+            
+        Returns:
+            IDs of the inserted nodes
+        """
+        if not nodes:
+            return []
+        
+        # Connects and creates the table on first use, as add() does
+        vector_store._initialize()
+        table = vector_store._table_class.__table__
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)  # Quoted "" stays '', not NULL
+        writer.writerows(VectorStoreProvider._node_row(vector_store, node) for node in nodes)
+        buffer.seek(0)
+        
+        connection = vector_store.client.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                # Chunks can be re-indexed, so don't wait on WAL flush per batch
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                cursor.copy_expert(
+                    f'COPY "{table.schema}"."{table.name}" (node_id, text, metadata_, embedding) '
+                    f'FROM STDIN WITH (FORMAT csv)',
+                    buffer,
+                )
+            connection.commit()
+        finally:
+            connection.close()
+        
+        return [node.node_id for node in nodes]
+    
+    @staticmethod
+    def knn_search(
+        vector_store: PGVectorStore,
+        query_embeddings: List[List[float]],
+        top_k: int = 5
+    ) -> List[VectorStoreQueryResult]:
+        """
+        Cosine KNN over a LlamaIndex PostgreSQL store with a prepared statement
+        
+        The statement is prepared once per pooled connection and afterwards
+        only EXECUTEd, so repeat searches skip parsing and planning. Behind
+        PgBouncer in transaction mode a session isn't pinned to a backend,
+        so this falls back to PGVectorStore.query().
+        
+        Args:
+            vector_store: Store returned by get_postgres_vector_store()
+            query_embeddings: One embedding per query
+            top_k: Number of results per query
+            
+        Returns:
+            One query result per embedding, in order
+        """
+        if VectorStoreConfig.POSTGRES_BEHIND_PGBOUNCER:
+            return [
+                vector_store.query(VectorStoreQuery(query_embedding=embedding, similarity_top_k=top_k))
+                for embedding in query_embeddings
+            ]
+        
+        vector_store._initialize()
+        table = vector_store._table_class.__table__
+        statement = f"knn_{table.name}"
+        vector_type = 'halfvec' if vector_store.use_halfvec else 'vector'
+        
+        results = []
+        connection = vector_store.client.raw_connection()
+        try:
+            # Cleared by SQLAlchemy whenever the DBAPI connection is replaced
+            prepared = connection.info.setdefault('prepared_statements', set())
+            with connection.cursor() as cursor:
+                if statement not in prepared:
+                    cursor.execute(
+                        f'PREPARE {statement} ({vector_type}, int) AS '
+                        f'SELECT node_id, text, metadata_, embedding <=> $1 AS distance '
+                        f'FROM "{table.schema}"."{table.name}" ORDER BY distance LIMIT $2'
+                    )
+                    prepared.add(statement)
+                
+                for embedding in query_embeddings:
+                    cursor.execute(f'EXECUTE {statement} (%s, %s)', (_vector_to_db(embedding), top_k))
+                    results.append(vector_store._db_rows_to_query_result([
+                        DBEmbeddingRow(
+                            node_id=node_id,
+                            text=text,
+                            metadata=metadata,
+                            custom_fields={},
+                            similarity=(1 - distance) if distance is not None else 0,
+                        )
+                        for node_id, text, metadata, distance in cursor.fetchall()
+                    ]))
+            connection.commit()
+        finally:
+            connection.close()
+        
+        return results
+    
+    @staticmethod
+    def get_postgres_bulk_writer(
+        vector_store: Optional[PGVectorStore] = None,
+        batch_size: int = 500
+    ) -> "PostgresBulkWriter":
+        """
+        Create a buffered writer that inserts many nodes per statement
+        
+        Args:
+            vector_store: Target store (defaults to get_postgres_vector_store())
+            batch_size: Rows buffered before an automatic flush
+            
+        Returns:
+            PostgresBulkWriter instance
+        """
+        if vector_store is None:
+            vector_store = VectorStoreProvider.get_postgres_vector_store()
+        return PostgresBulkWriter(vector_store, batch_size=batch_size)
+    
+    @staticmethod
+    def _node_row(vector_store: PGVectorStore, node: BaseNode) -> List[str]:
+        """Column values for one node, matching what PGVectorStore.add() stores"""
+        metadata = node_to_metadata_dict(
+            node,
+            remove_text=True,
+            flat_metadata=vector_store.flat_metadata,
+        )
+        return [
+            node.node_id,
+            node.get_content(metadata_mode=MetadataMode.NONE),
+            json.dumps(metadata),
+            _vector_to_db(node.get_embedding()),
+        ]
+    
     @staticmethod
     def get_redis_vector_store(
         index_name: str = "codebase_index",
@@ -72,16 +409,20 @@ class VectorStoreProvider:
         Returns:
             RedisVectorStore instance
         """
-        redis_host = os.getenv('REDIS_HOST', 'localhost')
-        redis_port = int(os.getenv('REDIS_PORT', '6379'))
-        redis_password = os.getenv('REDIS_PASSWORD', '')
+        redis_url = _redis_url()
         
-        return RedisVectorStore(
-            redis_url=f"redis://:{redis_password}@{redis_host}:{redis_port}" if redis_password 
-                     else f"redis://{redis_host}:{redis_port}",
-            index_name=index_name,
-            index_prefix=prefix,
-        )
+        def build() -> RedisVectorStore:
+            schema = RedisVectorStoreSchema()
+            schema.index.name = index_name
+            schema.index.prefix = prefix
+            
+            # Share pooled sockets instead of opening a connection per store
+            return RedisVectorStore(
+                schema=schema,
+                redis_client=redis.Redis(connection_pool=_redis_pool(redis_url)),
+            )
+        
+        return _cached_store(('llama_redis', redis_url, index_name, prefix), build)
     
     @staticmethod
     def get_langchain_postgres_store(
@@ -112,10 +453,21 @@ class VectorStoreProvider:
             f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
         )
         
-        return PGVector(
-            connection_string=connection_string,
-            collection_name=collection_name,
-            embedding_function=embeddings,
+        # Embeddings come from LLMFactory's cache, so id() is stable; the
+        # cached store also keeps the instance alive
+        def build() -> PGVector:
+            store = PGVector(
+                connection_string=connection_string,
+                collection_name=collection_name,
+                embedding_function=embeddings,
+            )
+            # LangChain shares one EmbeddingStore model per process
+            _use_json_vector_columns(store.EmbeddingStore)
+            return store
+        
+        return _cached_store(
+            ('langchain_postgres', connection_string, collection_name, id(embeddings)),
+            build,
         )
     
     @staticmethod
@@ -137,20 +489,104 @@ class VectorStoreProvider:
             from core.llm_factory.factory import LLMFactory
             embeddings = LLMFactory.get_langchain_embeddings()
         
-        redis_host = os.getenv('REDIS_HOST', 'localhost')
-        redis_port = int(os.getenv('REDIS_PORT', '6379'))
-        redis_password = os.getenv('REDIS_PASSWORD', '')
+        redis_url = _redis_url()
         
-        redis_url = (
-            f"redis://:{redis_password}@{redis_host}:{redis_port}" if redis_password 
-            else f"redis://{redis_host}:{redis_port}"
+        # LangChain builds its own client from the URL; cap its pool the same way
+        return _cached_store(
+            ('langchain_redis', redis_url, index_name, id(embeddings)),
+            lambda: LangChainRedis(
+                redis_url=redis_url,
+                index_name=index_name,
+                embedding=embeddings,
+                max_connections=VectorStoreConfig.REDIS_MAX_CONNECTIONS,
+            ),
         )
+    
+    @staticmethod
+    def reset_embeddings():
+        """
+        Drop the memoized embedding clients and every store built on them
         
-        return LangChainRedis(
-            redis_url=redis_url,
-            index_name=index_name,
-            embedding=embeddings,
-        )
+        Stores are keyed by id(embeddings), so they are cleared together to
+        keep a recycled id from matching a stale store.
+        """
+        from core.llm_factory.factory import _cached_langchain_embeddings, _cached_llama_index_embeddings
+        
+        with _stores_lock:
+            _cached_langchain_embeddings.cache_clear()
+            _cached_llama_index_embeddings.cache_clear()
+            _stores.clear()
+
+
+class PostgresBulkWriter:
+    """Buffers embedded nodes and writes them with multi-row INSERTs"""
+    
+    # Postgres accepts at most 65535 bind parameters per statement
+    MAX_PARAMETERS = 65535
+    COLUMNS = ('node_id', 'text', 'metadata_', 'embedding')
+    
+    def __init__(self, vector_store: PGVectorStore, batch_size: int = 500):
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        self._rows: List[List[str]] = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+    
+    def add(self, node: BaseNode, embedding: Optional[List[float]] = None) -> None:
+        """
+        Queue a node, flushing once the buffer reaches batch_size
+        
+        Args:
+            node: Node to store
+            embedding: Embedding to attach (if not already set on the node)
+        """
+        if embedding is not None:
+            node.embedding = embedding
+        self._rows.append(VectorStoreProvider._node_row(self.vector_store, node))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Write all queued rows
+        
+        Returns:
+            Number of rows written
+        """
+        if not self._rows:
+            return 0
+        
+        self.vector_store._initialize()
+        table = self.vector_store._table_class.__table__
+        columns = ', '.join(self.COLUMNS)
+        row_placeholder = '(' + ', '.join(['%s'] * len(self.COLUMNS)) + ')'
+        
+        # Split into as few statements as the parameter limit allows
+        max_rows = self.MAX_PARAMETERS // len(self.COLUMNS)
+        
+        connection = self.vector_store.client.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                for start in range(0, len(self._rows), max_rows):
+                    rows = self._rows[start:start + max_rows]
+                    cursor.execute(
+                        f'INSERT INTO "{table.schema}"."{table.name}" ({columns}) '
+                        f'VALUES {", ".join([row_placeholder] * len(rows))}',
+                        [value for row in rows for value in row],
+                    )
+            connection.commit()
+        finally:
+            connection.close()
+        
+        written = len(self._rows)
+        self._rows = []
+        return written
 
 
 class VectorStoreConfig:
@@ -163,7 +599,18 @@ class VectorStoreConfig:
     POSTGRES_TABLE_NAME = "llama_index_embeddings"
     POSTGRES_SCHEMA = "public"
     EMBEDDING_DIMENSION = 1536  # OpenAI default
+    # FP16 halves row and HNSW size. Opt-in: tables created with FP32 vector
+    # columns have no vector <=> halfvec operator or halfvec_cosine_ops index,
+    # so only enable DB_USE_HALFVEC=1 on a fresh (or converted) table
+    POSTGRES_USE_HALFVEC = os.getenv('DB_USE_HALFVEC', '0') == '1'
+    # Session settings for the post-load HNSW build
+    POSTGRES_MAINTENANCE_WORK_MEM = os.getenv('DB_MAINTENANCE_WORK_MEM', '1GB')
+    POSTGRES_MAINTENANCE_WORKERS = int(os.getenv('DB_MAINTENANCE_WORKERS', '4'))
+    # Session state such as prepared statements doesn't survive transaction pooling
+    POSTGRES_BEHIND_PGBOUNCER = os.getenv('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes', 'on')
     
     # Redis settings
     REDIS_INDEX_NAME = "codebase_index"
     REDIS_PREFIX = "doc"
+    REDIS_MAX_CONNECTIONS = 32
+    REDIS_PIPELINE_BATCH_SIZE = 500  # Writes sent per pipeline round-trip
@@ -0,0 +1,46 @@
+"""
+Management command to build the HNSW index on the embeddings table
+"""
+from django.core.management.base import BaseCommand
+
+from core.llm_factory.providers import VectorStoreProvider
+
+
+class Command(BaseCommand):
+    help = 'Build the pgvector HNSW index (run after bulk indexing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            type=str,
+            default='embeddings',
+            help='Vector store table name',
+        )
+        parser.add_argument(
+            '--m',
+            type=int,
+            default=16,
+            help='Max connections per graph node',
+        )
+        parser.add_argument(
+            '--ef-construction',
+            type=int,
+            default=64,
+            help='Candidate list size while building',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Building HNSW index...")
+        
+        vector_store = VectorStoreProvider.get_postgres_vector_store(
+            table_name=options['table']
+        )
+        index_name = VectorStoreProvider.create_hnsw_index(
+            vector_store,
+            m=options['m'],
+            ef_construction=options['ef_construction'],
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ HNSW index {index_name} is ready"
+        ))
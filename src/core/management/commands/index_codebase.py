@@ -1,6 +1,7 @@
 """
 Management command to initialize and index the codebase
 """
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.conf import settings
 import os
@@ -24,16 +25,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Use Redis instead of PostgreSQL for vector storage',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes to shard files across (0 = one per CPU)',
+        )
+        parser.add_argument(
+            '--skip-vector-index',
+            action='store_true',
+            help='Do not build the HNSW index after loading (PostgreSQL only)',
+        )
 
     def handle(self, *args, **options):
         root_path = options['path']
         use_postgres = not options['use_redis']
+        workers = options['workers'] or os.cpu_count() or 1
         
         if not root_path:
             root_path = os.path.join(settings.BASE_DIR, '..')
         
         self.stdout.write(f"Indexing codebase from: {root_path}")
         self.stdout.write(f"Using: {'PostgreSQL' if use_postgres else 'Redis'}")
+        self.stdout.write(f"Workers: {workers}")
         
         # Create indexing job
         job = IndexingJob.objects.create(status='pending')
@@ -43,7 +57,7 @@ class Command(BaseCommand):
             indexer = CodebaseIndexer(use_postgres=use_postgres)
             
             # Index codebase
-            result = indexer.index_codebase(root_path, job_id=str(job.id))
+            result = indexer.index_codebase(root_path, job_id=str(job.id), workers=workers)
             
             self.stdout.write(self.style.SUCCESS(
                 f"Indexing completed successfully!"
@@ -52,6 +66,10 @@ class Command(BaseCommand):
             self.stdout.write(f"Processed files: {result['processed_files']}")
             self.stdout.write(f"Total chunks: {result['total_chunks']}")
             
+            # Index after the load, so inserts don't maintain the graph
+            if use_postgres and not options['skip_vector_index']:
+                call_command('create_vector_index', stdout=self.stdout)
+            
         except Exception as e:
             self.stdout.write(self.style.ERROR(
                 f"Indexing failed: {str(e)}"
@@ -2,7 +2,11 @@
 Management command to setup pgvector extension
 """
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, transaction
+
+
+# Arbitrary key shared by every process running this command
+SETUP_LOCK_KEY = 4711
 
 
 class Command(BaseCommand):
@@ -12,7 +16,12 @@ class Command(BaseCommand):
         self.stdout.write("Enabling pgvector extension...")
         
         try:
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Serialize concurrent runs (e.g. several containers starting
+                # at once); the lock is released when the transaction ends
+                cursor.execute("SET LOCAL lock_timeout = '5s';")
+                cursor.execute("SELECT pg_advisory_xact_lock(%s);", [SETUP_LOCK_KEY])
+                
                 # Enable pgvector extension
                 cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
                 
@@ -0,0 +1,15 @@
+from django.middleware.gzip import GZipMiddleware
+
+
+class EventStreamGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves server-sent event streams uncompressed.
+    
+    Django's streaming gzip buffers output inside the compressor, which
+    would hold back SSE frames until the whole response is finished.
+    """
+    
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:17
+
+import core.models
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_document_content_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='id',
+            field=models.UUIDField(
+                default=core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='id',
+            field=models.UUIDField(
+                default=core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=['created_at'], name='documents_created_brin_idx'
+            ),
+        ),
+    ]
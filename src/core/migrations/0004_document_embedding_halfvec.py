@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:20
+
+import pgvector.django.halfvec
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='embedding',
+            field=pgvector.django.halfvec.HalfVectorField(
+                blank=True, dimensions=1536, null=True
+            ),
+        ),
+    ]
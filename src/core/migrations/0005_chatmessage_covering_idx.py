@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_document_embedding_halfvec'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='chatmessage',
+            name='chat_messag_session_597c4e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(
+                fields=['session', '-created_at'],
+                include=('role',),
+                name='chatmsg_sess_ct_cov',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_chatmessage_covering_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='document',
+            name='documents_file_pa_fcd9de_idx',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_remove_document_file_path_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatsession',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(
+                fields=['-updated_at'], name='chat_sessions_updated_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 00:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_chat_session_activity_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('file_path'),
+                    name='gin_trgm_ops',
+                ),
+                name='documents_path_trgm_idx',
+            ),
+        ),
+    ]
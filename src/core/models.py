@@ -1,16 +1,35 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.db.models.functions import Upper
+from pgvector.django import HalfVectorField
+import os
+import time
 import uuid
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7)
+    
+    The leading 48 bits are the Unix time in milliseconds, so new rows land
+    at the right-hand edge of the primary key index instead of random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms << 80) | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class Document(models.Model):
     """Store indexed documents from the codebase"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     file_path = models.CharField(max_length=500, unique=True)
     content = models.TextField()
     metadata = models.JSONField(default=dict)
-    embedding = VectorField(dimensions=1536, null=True, blank=True)  # OpenAI embeddings
+    embedding = HalfVectorField(dimensions=1536, null=True, blank=True)  # OpenAI embeddings, FP16
     chunk_index = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -18,8 +37,13 @@ class Document(models.Model):
     class Meta:
         db_table = 'documents'
         indexes = [
-            models.Index(fields=['file_path']),
             models.Index(fields=['created_at']),
+            # Rows arrive in created_at order, so a BRIN index stays tiny
+            BrinIndex(fields=['created_at'], name='documents_created_brin_idx'),
+            # Trigram indexes for admin search. Django ORs UPPER(...) LIKE over
+            # every search field, so each one needs an index for a BitmapOr
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='documents_content_trgm_idx'),
+            GinIndex(OpClass(Upper('file_path'), name='gin_trgm_ops'), name='documents_path_trgm_idx'),
         ]
         
     def __str__(self):
@@ -31,12 +55,16 @@ class ChatSession(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Last activity; bumped once per chat request by ChatbotService, not on every save()
+    updated_at = models.DateTimeField(default=timezone.now)
     metadata = models.JSONField(default=dict)
     
     class Meta:
         db_table = 'chat_sessions'
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['-updated_at'], name='chat_sessions_updated_idx'),
+        ]
         
     def __str__(self):
         return f"Session {self.id} - {self.title or 'Untitled'}"
@@ -50,7 +78,7 @@ class ChatMessage(models.Model):
         ('system', 'System'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     content = models.TextField()
@@ -62,7 +90,9 @@ class ChatMessage(models.Model):
         db_table = 'chat_messages'
         ordering = ['created_at']
         indexes = [
-            models.Index(fields=['session', 'created_at']),
+            # Covers "latest messages of a session"; content stays out because
+            # B-tree entries are capped at ~2.7 KB and answers can be longer
+            models.Index(fields=['session', '-created_at'], include=['role'], name='chatmsg_sess_ct_cov'),
         ]
         
     def __str__(self):
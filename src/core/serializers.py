@@ -25,14 +25,23 @@ class ChatSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.last()
-        if last_msg:
-            return {
-                'content': last_msg.content[:100] + '...' if len(last_msg.content) > 100 else last_msg.content,
-                'role': last_msg.role,
-                'created_at': last_msg.created_at,
-            }
-        return None
+        # Use the view's last_message_* annotations when present
+        if hasattr(obj, 'last_message_content'):
+            content = obj.last_message_content
+            role, created_at = obj.last_message_role, obj.last_message_created_at
+        else:
+            last_msg = obj.messages.last()
+            if not last_msg:
+                return None
+            content, role, created_at = last_msg.content, last_msg.role, last_msg.created_at
+        
+        if content is None:
+            return None
+        return {
+            'content': content[:100] + '...' if len(content) > 100 else content,
+            'role': role,
+            'created_at': created_at,
+        }
 
 
 class ChatSessionDetailSerializer(serializers.ModelSerializer):
@@ -51,6 +60,11 @@ class ChatRequestSerializer(serializers.Serializer):
     session_id = serializers.UUIDField(required=False, allow_null=True)
 
 
+class BulkClearRequestSerializer(serializers.Serializer):
+    """Serializer for bulk chat history clearing"""
+    session_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+
 class ChatResponseSerializer(serializers.Serializer):
     """Serializer for chat responses"""
     session_id = serializers.UUIDField()
@@ -88,9 +102,17 @@ class IndexingRequestSerializer(serializers.Serializer):
 
 
 class SearchRequestSerializer(serializers.Serializer):
-    """Serializer for document search requests"""
-    query = serializers.CharField(required=True)
+    """Serializer for document search requests (one query or a batch)"""
+    query = serializers.CharField(required=False)
+    queries = serializers.ListField(
+        child=serializers.CharField(), required=False, allow_empty=False, max_length=50
+    )
     top_k = serializers.IntegerField(default=5, min_value=1, max_value=20)
+    
+    def validate(self, attrs):
+        if 'query' not in attrs and 'queries' not in attrs:
+            raise serializers.ValidationError("Either 'query' or 'queries' is required.")
+        return attrs
 
 
 class SearchResultSerializer(serializers.Serializer):
@@ -0,0 +1,857 @@
+"""Sample sources for exercising ArchitectureVisitor by hand."""
+
+test_code = """
+from typing import List, Dict, Optional, Union, Any, TypeVar, Generic
+from abc import ABC, abstractmethod
+import datetime
+
+# [COMPLEXITY 1] Generics & Abstractions
+T = TypeVar("T")
+
+class Repository(Generic[T], ABC):
+    @abstractmethod
+    def save(self, entity: T) -> None:
+        pass
+
+class LoggableMixin:
+    def log(self, msg: str):
+        print(f"[LOG] {msg}")
+
+# [COMPLEXITY 2] Domain Models
+class Product:
+    def __init__(self, name: str, price: float):
+        self.name = name
+        self.price = price
+
+class User:
+    def __init__(self, uid: str):
+        self.uid = uid
+
+# [COMPLEXITY 3] Naming Collision Trap for Regex
+# Your regex must NOT draw an arrow from 'Product' to 'ProductionConfig'
+class ProductionConfig:
+    def __init__(self):
+        self.env = "PROD"
+        self.retries = 3
+
+# [COMPLEXITY 4] Infrastructure Layer
+class PostgresConnection:
+    def connect(self):
+        pass
+
+class RedisCache:
+    def set(self, key, val):
+        pass
+
+# [COMPLEXITY 5] Implementation with Mixins
+class SqlProductRepository(Repository[Product], LoggableMixin):
+    def __init__(self, db_conn):
+        # [TRAP] Untyped Dependency!
+        # The AI Enricher should infer that 'db_conn' is 'PostgresConnection' 
+        # based on usage or naming convention.
+        self.db = db_conn 
+        
+    def save(self, entity: Product) -> None:
+        self.log(f"Saving {entity.name}")
+
+# [COMPLEXITY 6] The Service Layer (The Spiderweb)
+class ECommerceService:
+    def __init__(self, repo: SqlProductRepository, config: ProductionConfig):
+        # Typed Dependency (Easy for Visitor)
+        self.repository: SqlProductRepository = repo
+        self.config: ProductionConfig = config
+        
+        # [TRAP] Constructor Inference
+        # Visitor should see this is a 'RedisCache'
+        self.cache = RedisCache()
+        
+        # [TRAP] Complex Nested Type
+        # A Dictionary mapping User IDs to a List of Products
+        self.cart_state: Dict[str, List[Product]] = {}
+        
+        # [TRAP] Forward Reference (String literal)
+        # Common in Django/FastAPI. Visitor needs to handle string 'User'
+        self.current_admin: Optional['User'] = None
+        
+        # [TRAP] Union Type
+        self.last_error: Union[ValueError, ConnectionError, None] = None
+
+    def checkout(self, user_id: str) -> bool:
+        return True
+"""
+
+test_2 = """
+from typing import List, Dict, Union, Optional, TypeVar, Generic, Callable
+from abc import ABC, abstractmethod
+import datetime
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# --------------------------
+# Mixins, Multiple Inheritance
+# --------------------------
+class TimestampMixin:
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    
+    def touch(self):
+        self.updated_at = datetime.datetime.now()
+
+class LoggingMixin:
+    def log(self, msg: str):
+        print(f"[LOG] {msg}")
+
+# --------------------------
+# Abstract & Generic Repositories
+# --------------------------
+class Repository(ABC, Generic[T]):
+    @abstractmethod
+    def save(self, entity: T) -> None:
+        pass
+
+class AuditableRepository(Repository[T], TimestampMixin):
+    def audit(self, entity: T):
+        self.touch()
+
+# --------------------------
+# Domain Models with nested attributes
+# --------------------------
+class Product:
+    def __init__(self, name: str, price: float):
+        self.name = name
+        self.price = price
+        self.tags: Optional[List[str]] = None
+        self.metadata: Dict[str, Union[str, int, float]] = {}
+
+class User:
+    def __init__(self, uid: str):
+        self.uid = uid
+        self.purchase_history: List['Product'] = []
+
+class Admin(User, LoggingMixin):
+    def __init__(self, uid: str, level: int):
+        super().__init__(uid)
+        self.level = level
+        self.permissions: Dict[str, bool] = {}
+
+# --------------------------
+# Edge Cases: naming collisions
+# --------------------------
+class ProductConfig:
+    def __init__(self):
+        self.env = "PROD"
+        self.retries = 3
+
+class Product:
+    def __init__(self):
+        self.code = "X123"
+
+# --------------------------
+# Complex Services Layer
+# --------------------------
+class ECommerceService:
+    def __init__(self, repo: AuditableRepository['Product'], cache):
+        self.repo: AuditableRepository['Product'] = repo
+        self.cache = cache
+        self.cart_state: Dict[str, List[Product]] = {}
+        self.admin: Optional[Admin] = None
+        self.last_error: Union[ValueError, KeyError, None] = None
+
+    def checkout(self, user_id: str) -> bool:
+        if user_id not in self.cart_state:
+            self.last_error = KeyError("User cart missing")
+            return False
+        return True
+
+    def add_product(self, user_id: str, product: Product):
+        self.cart_state.setdefault(user_id, []).append(product)
+
+# --------------------------
+# Infrastructure Layer
+# --------------------------
+class RedisCache:
+    def __init__(self, host: str = "localhost", port: int = 6379):
+        self.host = host
+        self.port = port
+        self.store: Dict[str, object] = {}
+
+    def set(self, key: str, val: object):
+        self.store[key] = val
+
+    def get(self, key: str) -> object:
+        return self.store.get(key)
+
+class PostgresConnection:
+    def connect(self):
+        pass
+
+# --------------------------
+# Implementation & Dependency Injection
+# --------------------------
+class ProductRepository(AuditableRepository[Product], LoggingMixin):
+    def __init__(self, conn: PostgresConnection, cache: RedisCache):
+        self.db = conn
+        self.cache = cache
+
+    def save(self, entity: Product) -> None:
+        self.log(f"Saving {entity}")
+        self.db.connect()
+
+# --------------------------
+# Boilerplate Factory Patterns
+# --------------------------
+class RepositoryFactory:
+    @staticmethod
+    def create_product_repo(conn: PostgresConnection, cache: RedisCache) -> ProductRepository:
+        return ProductRepository(conn, cache)
+
+class ServiceFactory:
+    @staticmethod
+    def create_ecommerce_service(repo: AuditableRepository[Product], cache: RedisCache) -> ECommerceService:
+        return ECommerceService(repo, cache)
+
+# --------------------------
+# Dynamic & Callable Attributes
+# --------------------------
+class DynamicAttributes:
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[int], int]] = {}
+        for name in ["add", "multiply"]:
+            self._handlers[name] = getattr(self, f"_{name}_impl")
+
+    def _add_impl(self, x: int) -> int:
+        return x + 1
+
+    def _multiply_impl(self, x: int) -> int:
+        return x * 2
+
+
+"""
+test_1 = """
+import ast
+import json
+from typing import List, Dict, Union, Optional, Callable, NewType
+from abc import ABC
+
+# [HARD] 1. Dynamic Base Classes & Aliasing
+# AST visitors often fail to resolve 'Base' when it's conditional or aliased
+DEBUG = True
+Base = object if DEBUG else ABC
+
+# [HARD] 2. Type Aliases
+# Visitor needs to resolve 'UserId' to 'int' or keep it as a domain type
+UserId = NewType('UserId', int)
+
+class ComplexSystem(Base):
+    # [HARD] 3. Class-Level Attributes (Static Fields)
+    # Your current code only looks for 'self.var' inside methods.
+    # It will likely MISS 'version' and 'config'.
+    version: str = "1.0.0"
+    config = {"timeout": 30}
+
+    def __init__(self):
+        # [HARD] 4. Tuple Unpacking Assignment
+        # AST represents this as a Tuple node, not a direct Attribute.
+        # Your visitor will likely CRASH or MISS 'x' and 'y'.
+        self.x, self.y = (10.0, 20.0)
+
+        # [HARD] 5. Chained Assignments
+        # Resolving 'self.a' and 'self.b' simultaneously
+        self.a = self.b = 0
+
+        # [HARD] 6. Binary Operations / Complex Values
+        # Your code ignores 'BinOp' (math) and non-Call/Constant values.
+        # This attribute will be inferred as "Unknown" or ignored entirely.
+        self.calculated_val = 100 * 5 + 2
+
+        # [HARD] 7. List/Dict Comprehensions
+        # Common pattern, but complex AST node structure (ListComp).
+        self.squared_map = {i: i*i for i in range(10)}
+
+        # [HARD] 8. Lambda Functions
+        # 'self.handler' is a function, but assigned as a variable.
+        self.handler = lambda x: x + 1
+
+    def dynamic_loader(self):
+        # [HARD] 9. Dynamic Attribute Injection (setattr)
+        # Static analysis CANNOT easily see 'self.plugin'.
+        # This requires symbolic execution or very specific pattern matching.
+        setattr(self, "plugin", "LoadedPlugin")
+
+    @property
+    def status(self) -> str:
+        # [HARD] 10. Properties
+        # Is this a method or an attribute? PlantUML usually treats properties
+        # as attributes, but AST sees a FunctionDef with a decorator.
+        return "Active"
+
+    def complex_typing(self, data: Dict[UserId, List[Union[str, 'ComplexSystem']]]):
+        # [HARD] 11. Forward References & Quotes
+        # 'ComplexSystem' is quoted (forward ref) and recursive.
+        pass
+
+# [HARD] 12. Inner Classes
+# Classes defined inside other scopes.
+# Your visitor tracks 'current_class' globally; nesting might overwrite state.
+class Outer:
+    class Inner:
+        def __init__(self):
+            self.inner_var = 1
+
+"""
+test = """
+
+from typing import (
+    List, Dict, Set, Tuple, Union, Optional, Any, TypeVar, Generic,
+    Callable, Protocol, Literal, TypedDict, ClassVar, Final,
+    Annotated, overload, TYPE_CHECKING
+)
+from abc import ABC, abstractmethod, ABCMeta
+from dataclasses import dataclass, field
+from collections.abc import Iterable, Mapping
+from enum import Enum, auto
+import sys
+import asyncio
+from contextlib import contextmanager
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# ============================================================================
+# SECTION 1: TYPE SYSTEM NIGHTMARES
+# ============================================================================
+
+T = TypeVar('T')
+U = TypeVar('U', bound='BaseEntity')
+V = TypeVar('V', int, str)  # Constrained TypeVar
+Numeric = TypeVar('Numeric', int, float, complex)
+
+# Recursive type alias
+JsonValue = Union[None, bool, int, float, str, List['JsonValue'], Dict[str, 'JsonValue']]
+
+# Protocol (structural typing)
+class Comparable(Protocol):
+    def __lt__(self, other: Any) -> bool: ...
+
+# TypedDict
+class UserDict(TypedDict, total=False):
+    id: int
+    name: str
+    metadata: Dict[str, Any]
+
+# Literal types
+Mode = Literal['read', 'write', 'append']
+
+# ============================================================================
+# SECTION 2: METACLASS & DYNAMIC CLASS CONSTRUCTION
+# ============================================================================
+
+class SingletonMeta(type):
+    _instances: Dict[type, Any] = {}
+    
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+# Dynamic base selection
+DEBUG_MODE = True
+RuntimeBase = ABC if DEBUG_MODE else object
+
+class DynamicInheritance(RuntimeBase, metaclass=ABCMeta):
+    
+    pass
+
+# ============================================================================
+# SECTION 3: EXTREME ATTRIBUTE ASSIGNMENT PATTERNS
+# ============================================================================
+
+@dataclass
+class ComplexEntity:
+    # Dataclass fields (ignored by normal AST visitors)
+    id: int
+    name: str = field(default="Unknown")
+    tags: List[str] = field(default_factory=list)
+    metadata: ClassVar[Dict[str, Any]] = {}  # Class variable
+    _internal: int = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self):
+        # Post-initialization attributes
+        self.computed_hash = hash(self.name)
+        object.__setattr__(self, 'frozen_val', 42)  # Bypassing frozen dataclass
+
+class AttributeChaos:
+    # Class-level type hints without values
+    class_var: ClassVar[int]
+    annotated_only: str
+    
+    # Class-level with values
+    VERSION: Final[str] = "2.0.0"
+    config = {"nested": {"deep": {"value": 1}}}
+    
+    def __init__(self, x: int, y: str, *args, **kwargs):
+        # 1. Multiple unpacking patterns
+        self.a, self.b, *self.rest = [1, 2, 3, 4, 5]
+        
+        # 2. Nested tuple unpacking
+        (self.x1, self.y1), (self.x2, self.y2) = ((1, 2), (3, 4))
+        
+        # 3. Starred expression
+        *self.prefix, self.last = range(10)
+        
+        # 4. Walrus operator in assignment
+        if (self.cached := self._expensive_call()) > 10:
+            self.threshold = self.cached * 2
+        
+        # 5. Chained assignments
+        self.alpha = self.beta = self.gamma = []
+        
+        # 6. Dictionary unpacking
+        defaults = {'timeout': 30, 'retries': 3}
+        self.__dict__.update(**defaults)  # Dynamic attributes!
+        
+        # 7. Conditional assignment
+        self.value = x if x > 0 else y
+        
+        # 8. Complex expressions
+        self.computed = (x ** 2 + y.__len__()) / max(args, default=1)
+        
+        # 9. Lambda
+        self.transformer: Callable[[int], int] = lambda n: n * 2
+        
+        # 10. Comprehensions
+        self.squares = {i: i**2 for i in range(10)}
+        self.filtered = [x for x in args if isinstance(x, int)]
+        
+        # 11. Generator expression (NOT a list)
+        self.lazy_gen = (x for x in range(1000))
+        
+        # 12. Set and dict
+        self.unique_items = {*args, *kwargs.values()}
+        
+        # 13. Slice assignment
+        self.buffer = [0] * 100
+        self.buffer[10:20] = [1] * 10
+        
+        # 14. Augmented assignment
+        self.counter = 0
+        self.counter += 1
+        self.counter *= 2
+        
+        # 15. Dynamic attribute names
+        for key in kwargs:
+            setattr(self, f"dynamic_{key}", kwargs[key])
+    
+    def _expensive_call(self):
+        return 42
+    
+    @property
+    def smart_property(self) -> int:
+        return self.counter
+    
+    @smart_property.setter
+    def smart_property(self, value: int):
+        self.counter = value
+    
+    @smart_property.deleter
+    def smart_property(self):
+        del self.counter
+
+# ============================================================================
+# SECTION 4: INHERITANCE NIGHTMARES
+# ============================================================================
+
+class Mixin1:
+    def m1(self): pass
+
+class Mixin2:
+    def m2(self): pass
+
+class Mixin3:
+    def m3(self): pass
+
+# Multiple inheritance with method resolution order complexity
+class MultiInherit(Mixin1, Mixin2, Mixin3, DynamicInheritance):
+    
+    pass
+
+# Generic with multiple type parameters and constraints
+class Repository(Generic[T, U], ABC):
+    items: Dict[int, T]
+    
+    @abstractmethod
+    def save(self, item: T) -> U: ...
+
+class CachedRepository(Repository[T, U], Mixin1):
+    def __init__(self):
+        self.cache: Dict[str, T] = {}
+        self.items: Dict[int, T] = {}  # Overriding parent type hint
+
+# Nested generic inheritance
+class SpecializedRepo(CachedRepository[ComplexEntity, 'OperationResult']):
+    def __init__(self, conn: 'DatabaseConnection'):
+        super().__init__()
+        self.connection = conn  # Type inference needed!
+
+# ============================================================================
+# SECTION 5: FORWARD REFERENCES & CIRCULAR DEPENDENCIES
+# ============================================================================
+
+class Node:
+    def __init__(self, value: int):
+        self.value = value
+        self.children: List['Node'] = []  # Self-reference
+        self.parent: Optional['Node'] = None
+        self.sibling: Union['Node', 'Leaf', None] = None  # Cross-reference
+
+class Leaf:
+    def __init__(self):
+        self.attached_node: Optional[Node] = None
+
+class Tree:
+    def __init__(self):
+        self.root: 'Node' = Node(0)  # Forward ref in quotes
+        self.registry: Dict[int, Union[Node, Leaf]] = {}
+        
+        # Circular reference nightmare
+        self.metadata: 'TreeMetadata' = None  # type: ignore
+
+class TreeMetadata:
+    def __init__(self, tree: Tree):
+        self.parent_tree = tree
+
+# ============================================================================
+# SECTION 6: ADVANCED TYPE ANNOTATIONS
+# ============================================================================
+
+class AdvancedTypes:
+    # Annotated with metadata
+    user_id: Annotated[int, "Must be positive"]
+    
+    # Callable with complex signature
+    callback: Callable[[int, str], Tuple[bool, Optional[str]]]
+    
+    # Nested generics
+    matrix: List[List[List[float]]]
+    
+    # Union of generics
+    storage: Union[Dict[str, List[int]], Set[Tuple[str, int]]]
+    
+    # Optional nested
+    maybe_nested: Optional[Dict[str, Optional[List[Optional[int]]]]]
+    
+    # Generic protocol
+    comparator: Comparable
+    
+    # Literal union
+    status: Union[Literal['pending'], Literal['active'], Literal['done']]
+    
+    def __init__(self):
+        # Type narrowing scenarios
+        self.value: Union[int, str] = 42
+        if isinstance(self.value, int):
+            self.numeric_value = self.value  # Should infer as int
+        
+        # Complex callable assignment
+        self.processor: Callable[[JsonValue], JsonValue] = lambda x: x
+
+# ============================================================================
+# SECTION 7: SPECIAL METHODS & DESCRIPTORS
+# ============================================================================
+
+class Descriptor:
+    def __get__(self, obj, objtype=None):
+        return 42
+    
+    def __set__(self, obj, value):
+        pass
+
+class SpecialMethods:
+    managed_attr = Descriptor()  # Descriptor protocol
+    
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+    
+    def __getattr__(self, name: str):
+        # Dynamic attribute access
+        return self._data.get(name)
+    
+    def __setattr__(self, name: str, value: Any):
+        if name == '_data':
+            object.__setattr__(self, name, value)
+        else:
+            self._data[name] = value
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+    
+    def __setitem__(self, key: str, value: Any):
+        self._data[key] = value
+
+# ============================================================================
+# SECTION 8: ASYNC & CONTEXT MANAGERS
+# ============================================================================
+
+class AsyncResource:
+    def __init__(self):
+        self.connection: Optional['AsyncConnection'] = None
+    
+    async def __aenter__(self) -> 'AsyncResource':
+        self.connection = await self._connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.connection.close()
+    
+    async def _connect(self) -> 'AsyncConnection':
+        return AsyncConnection()
+
+class AsyncConnection:
+    async def close(self):
+        pass
+
+# ============================================================================
+# SECTION 9: ENUMS & SPECIAL CLASSES
+# ============================================================================
+
+class Status(Enum):
+    PENDING = auto()
+    ACTIVE = auto()
+    DONE = auto()
+    
+    def describe(self) -> str:
+        return self.name.lower()
+
+# ============================================================================
+# SECTION 10: NAMING COLLISION TRAPS
+# ============================================================================
+
+class Product:
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.price: float = 0.0
+
+class ProductConfig:
+    
+    def __init__(self):
+        self.env = "production"
+
+class ProductionManager:
+    
+    def __init__(self):
+        self.products: List[Product] = []  # This SHOULD have arrow
+        self.config = ProductConfig()  # This SHOULD have arrow
+
+class ProductFactory:
+    
+    @staticmethod
+    def create(name: str) -> Product:
+        return Product(name)
+
+# ============================================================================
+# SECTION 11: DEPENDENCY INJECTION & CONSTRUCTOR COMPLEXITY
+# ============================================================================
+
+class DatabaseConnection:
+    pass
+
+class CacheLayer:
+    pass
+
+class Logger:
+    pass
+
+class MessageQueue:
+    pass
+
+class ComplexService:
+    def __init__(
+        self,
+        db: DatabaseConnection,
+        cache: CacheLayer,
+        logger: Logger,
+        queue: MessageQueue,
+        config: Optional[ProductConfig] = None,
+        *middleware,
+        **options
+    ):
+        # Should infer all of these types from constructor args!
+        self.database = db
+        self.cache_layer = cache
+        self.log = logger
+        self.mq = queue
+        
+        # Optional should be preserved
+        self.configuration = config
+        
+        # Args/kwargs - harder to type
+        self.middleware_stack = list(middleware)
+        self.runtime_options = options
+        
+        # Nested dependency
+        self.fallback_cache = CacheLayer()  # Direct instantiation
+        
+        # Complex initialization
+        self.connection_pool: List[DatabaseConnection] = [
+            DatabaseConnection() for _ in range(3)
+        ]
+
+# ============================================================================
+# SECTION 12: OVERLOADED METHODS
+# ============================================================================
+
+class OverloadExample:
+    @overload
+    def process(self, data: int) -> str: ...
+    
+    @overload
+    def process(self, data: str) -> int: ...
+    
+    def process(self, data: Union[int, str]) -> Union[str, int]:
+        if isinstance(data, int):
+            return str(data)
+        return len(data)
+
+# ============================================================================
+# SECTION 13: INNER CLASSES & NESTED SCOPES
+# ============================================================================
+
+class Outer:
+    outer_class_var: ClassVar[int] = 1
+    
+    class Inner:
+        inner_var: str = "test"
+        
+        def __init__(self):
+            self.instance_var = 42
+        
+        class DeepInner:
+            def __init__(self):
+                self.deep_value = "nested"
+    
+    def __init__(self):
+        self.inner_instance = self.Inner()
+        self.deep = self.Inner.DeepInner()
+
+# ============================================================================
+# SECTION 14: EDGE CASES THAT COMMONLY BREAK PARSERS
+# ============================================================================
+
+class EdgeCases:
+    def __init__(self):
+        # Attribute on method call result
+        self.length = "hello".upper().__len__()
+        
+        # Subscript on attribute
+        self.data_point = {"key": [1, 2, 3]}["key"][0]
+        
+        # Multiple attribute access
+        self.nested_value = ComplexEntity(1).metadata.get("key", {})
+        
+        # Conditional expression in type position (won't work but tests parser)
+        self.dynamic_type = int if True else str
+        
+        # Star unpacking in different contexts
+        self.unpacked_dict = {**{"a": 1}, **{"b": 2}}
+        self.unpacked_list = [*range(5), *range(5, 10)]
+        
+        # f-string (should be treated as str)
+        name = "test"
+        self.formatted = f"Hello {name}"
+        
+        # Bytes and raw strings
+        self.binary = b"binary data"
+        self.raw = 'raw\nstring'
+        
+        # Ellipsis
+        self.placeholder = ...
+        
+        # Complex slice
+        self.multi_slice = [[1, 2], [3, 4]][0:1][0]
+
+# ============================================================================
+# SECTION 15: THE FINAL BOSS - EVERYTHING COMBINED
+# ============================================================================
+
+class FinalBoss(
+    Repository[ComplexEntity, 'OperationResult'],
+    Mixin1,
+    Mixin2,
+    Generic[T],
+    metaclass=SingletonMeta
+):
+    
+    # Class variables with complex types
+    REGISTRY: ClassVar[Dict[str, 'FinalBoss']] = {}
+    _cache: ClassVar[Optional[CacheLayer]] = None
+    
+    def __init__(
+        self,
+        primary_db: DatabaseConnection,
+        *secondary_dbs: DatabaseConnection,
+        cache: Optional[CacheLayer] = None,
+        **options: Union[str, int, bool]
+    ):
+        # Constructor type inference
+        self.primary = primary_db
+        self.secondaries = list(secondary_dbs)
+        self.cache_instance = cache or CacheLayer()
+        
+        # Complex unpacking
+        self.x, *self.middle, self.z = range(100)
+        
+        # Nested types
+        self.graph: Dict[Node, List[Tuple[Node, float]]] = {}
+        
+        # Forward reference with generics
+        self.results: List['OperationResult[ComplexEntity]'] = []
+        
+        # Union of custom types
+        self.state: Union[Product, ComplexEntity, Node] = Product("test")
+        
+        # Callable with generics
+        self.mapper: Callable[[T], Optional[U]] = lambda x: None
+        
+        # All previous edge cases
+        (self.a, self.b), self.c = ((1, 2), 3)
+        self.lambda_ref = lambda: self.primary
+        self.comprehension = {k: v for k, v in options.items() if isinstance(v, str)}
+
+class OperationResult(Generic[T]):
+    def __init__(self, data: T):
+        self.data = data
+        self.success = True
+
+# ============================================================================
+# GLOBAL SCOPE COMPLEXITY
+# ============================================================================
+
+def standalone_function(x: ComplexEntity) -> OperationResult[ComplexEntity]:
+    return OperationResult(x)
+
+async def async_function(node: Node) -> List[Node]:
+    
+    return node.children
+
+@contextmanager
+def context_function() -> DatabaseConnection:
+    
+    conn = DatabaseConnection()
+    yield conn
+
+# Lambda in global scope
+global_lambda: Callable[[int], str] = lambda x: str(x)
+
+# ============================================================================
+# TYPE CHECKING ONLY IMPORTS
+# ============================================================================
+
+if TYPE_CHECKING:
+    # These should be visible to type checkers but not at runtime
+    from datetime import datetime
+    SpecialDateTime = datetime
+
+
+"""
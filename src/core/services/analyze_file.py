@@ -1,17 +1,52 @@
+"""
+File- and project-level analysis tools
+
+analyze_file() parses one file; analyze_files() runs it over many files,
+in worker processes once the batch is large enough to pay for them.
+get_core_classes() and search_by_pattern() work on a whole project.
+"""
 import ast
+import bisect
+import functools
+import hashlib
+import heapq
+import json
 import logging
+import os
+import stat
+import sys
+import tempfile
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Literal, Optional, Set
 from dataclasses import dataclass
 
 from architecture_service import ArchitectureVisitor
 from relationship_service import RelationshipExtractor, EnhancedProjectAnalyzer
+from files import FileSystemVisitor
+from discovery_tools import user_cache_dir
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 MAX_FILE_SIZE = 100_000  # 100KB
 SUPPORTED_EXTENSIONS = {'.py'}
+# ast.parse options, spelled out once: no type-comment parsing, grammar of
+# the running interpreter
+_PARSE_KW = dict(type_comments=False, feature_version=sys.version_info[:2])
+# Below this many files, worker startup costs more than it saves
+PARALLEL_MIN_FILES = 4
+
+# Visitor results, stored as JSON by content hash so unchanged files are not
+# re-parsed across runs. Bump the version when ArchitectureVisitor's output changes.
+_AST_CACHE_VERSION = 8
+# In-process front of the disk cache, keyed by (path, mtime_ns, size) so an
+# unchanged file is not even read or hashed again
+_MEMORY_CACHE_SIZE = 512
+_memory_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
 
 
 @dataclass
@@ -22,7 +57,66 @@ class AnalysisError:
     message: str
 
 
-def analyze_file(file_path: str) -> dict:
+def _memory_cache_get(key: tuple) -> Optional[str]:
+    with _memory_cache_lock:
+        payload = _memory_cache.get(key)
+        if payload is not None:
+            _memory_cache.move_to_end(key)
+        return payload
+
+
+def _memory_cache_put(key: tuple, payload: str):
+    with _memory_cache_lock:
+        _memory_cache[key] = payload
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _content_cache_key(content: bytes) -> str:
+    """Disk cache file name: content hash plus interpreter and cache version"""
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{digest}-{sys.implementation.cache_tag}-v{_AST_CACHE_VERSION}.json"
+
+
+@functools.lru_cache(maxsize=1)
+def _ast_cache_dir() -> Path:
+    """AST cache entries, inside the private per-user cache directory"""
+    cache_dir = user_cache_dir() / "ast"
+    cache_dir.mkdir(mode=0o700, exist_ok=True)
+    return cache_dir
+
+
+def _read_disk_cache(key: str) -> Optional[str]:
+    try:
+        return (_ast_cache_dir() / key).read_text(encoding='utf-8')
+    except OSError:
+        return None
+
+
+def _write_disk_cache(key: str, payload: str):
+    # Write then rename so concurrent readers never see a partial file.
+    # mkstemp creates the temp file with O_EXCL under a random name, so it
+    # never follows a symlink planted at a guessable path
+    try:
+        cache_dir = _ast_cache_dir()
+        fd, tmp_path = tempfile.mkstemp(prefix=key, suffix=".tmp", dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_dir / key)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.debug(f"Could not write AST cache entry {key}: {e}")
+
+
+def analyze_file(
+    file_path: str,
+    sort_imports: bool = False,
+    detail: Literal['full', 'summary', 'counts'] = 'full'
+) -> dict:
     """
     Analyze a single Python file without full project scan.
     
@@ -34,8 +128,15 @@ def analyze_file(file_path: str) -> dict:
     
     **Token efficiency:** ~300 tokens vs 30,000 for full project
     
+    **Caching:** unchanged files are not re-parsed (mtime/size in-process,
+    content hash on disk across runs)
+    
     Args:
         file_path: Absolute or relative path to .py file
+        sort_imports: Sort imports alphabetically (default: first-seen order)
+        detail: 'full' (below), 'summary' (classes as name/bases/method names,
+            functions as names) or 'counts' (no classes, functions or imports,
+            only the total_* numbers)
         
     Returns:
         {
@@ -56,7 +157,8 @@ def analyze_file(file_path: str) -> dict:
             "global_functions": [
                 {"name": str, "args": [str], "returns": str, "description": str}
             ],
-            "imports": [str],
+            "imports": [str],  # Deduplicated
+            "total_imports": int,
             "total_classes": int,
             "total_methods": int,
             "total_functions": int,
@@ -82,17 +184,27 @@ def analyze_file(file_path: str) -> dict:
     """
     
     try:
-        # Validate path
+        # Validate path with a single lstat (no symlink following)
         path = Path(file_path)
         
-        if not path.exists():
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
             return {
                 "success": False,
                 "file_path": str(file_path),
                 "error": f"File not found: {file_path}"
             }
         
-        if not path.is_file():
+        # Skip symlinks
+        if stat.S_ISLNK(st.st_mode):
+            return {
+                "success": False,
+                "file_path": str(file_path),
+                "error": "Symlinks not supported for security"
+            }
+        
+        if not stat.S_ISREG(st.st_mode):
             return {
                 "success": False,
                 "file_path": str(file_path),
@@ -107,7 +219,7 @@ def analyze_file(file_path: str) -> dict:
             }
         
         # Check file size
-        file_size = path.stat().st_size
+        file_size = st.st_size
         if file_size > MAX_FILE_SIZE:
             return {
                 "success": False,
@@ -117,73 +229,50 @@ def analyze_file(file_path: str) -> dict:
                 "error": f"File too large: {file_size} bytes (max {MAX_FILE_SIZE})"
             }
         
-        # Skip symlinks
-        if path.is_symlink():
-            return {
-                "success": False,
-                "file_path": str(file_path),
-                "error": "Symlinks not supported for security"
-            }
+        memory_key = (str(path.absolute()), st.st_mtime_ns, file_size)
+        payload = _memory_cache_get(memory_key)
+        if payload is None:
+            payload = _read_and_visit(path, file_path, file_size)
+            if isinstance(payload, dict):
+                return payload  # Read or parse error
+            _memory_cache_put(memory_key, payload)
         
-        # Read file content
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Fallback to latin-1
-            try:
-                with open(path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-            except Exception as e:
-                return {
-                    "success": False,
-                    "file_path": str(file_path),
-                    "error": f"Encoding error: {str(e)}"
-                }
-        
-        # Parse AST
-        try:
-            tree = ast.parse(content, filename=str(path))
-        except SyntaxError as e:
-            return {
-                "success": False,
-                "file_path": str(file_path),
-                "file_name": path.name,
-                "size": file_size,
-                "error": f"Syntax error at line {e.lineno}: {e.msg}"
-            }
-        
-        # Visit AST
-        visitor = ArchitectureVisitor()
-        visitor.visit(tree)
-        
-        # Extract imports (bonus feature)
-        imports = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ''
-                for alias in node.names:
-                    imports.append(f"{module}.{alias.name}" if module else alias.name)
+        analysis = json.loads(payload)
+        classes = analysis["classes"]
+        global_functions = analysis["global_functions"]
         
         # Calculate statistics
-        total_methods = sum(len(cls.get('methods', [])) for cls in visitor.structure)
+        total_methods = sum(len(cls.get('methods', [])) for cls in classes)
         
-        return {
+        result = {
             "success": True,
             "file_path": str(path.absolute()),
             "file_name": path.name,
             "size": file_size,
-            "classes": visitor.structure,
-            "global_functions": visitor.global_functions,
-            "imports": sorted(set(imports)),  # Deduplicate and sort
-            "total_classes": len(visitor.structure),
+            "total_imports": len(analysis["imports"]),
+            "total_classes": len(classes),
             "total_methods": total_methods,
-            "total_functions": len(visitor.global_functions),
+            "total_functions": len(global_functions),
             "error": None
         }
+        if detail == 'counts':
+            return result
+        
+        if detail == 'summary':
+            classes = [
+                {
+                    "name": cls["name"],
+                    "bases": cls["bases"],
+                    "methods": [method["name"] for method in cls["methods"]],
+                }
+                for cls in classes
+            ]
+            global_functions = [function["name"] for function in global_functions]
+        
+        result["classes"] = classes
+        result["global_functions"] = global_functions
+        result["imports"] = sorted(analysis["imports"]) if sort_imports else analysis["imports"]
+        return result
         
     except Exception as e:
         logger.error(f"Unexpected error analyzing {file_path}: {e}", exc_info=True)
@@ -194,10 +283,188 @@ def analyze_file(file_path: str) -> dict:
         }
 
 
+def _read_and_visit(path: Path, file_path: str, file_size: int):
+    """
+    Read, parse and visit a file, going through the content-hash disk cache
+    
+    Returns:
+        The visitor results as a JSON string, or an analyze_file error dict
+    """
+    # Read raw bytes: ast.parse decodes them itself, honouring coding cookies
+    try:
+        content = path.read_bytes()
+    except OSError as e:
+        return {
+            "success": False,
+            "file_path": str(file_path),
+            "error": f"Read error: {str(e)}"
+        }
+    
+    cache_key = _content_cache_key(content)
+    payload = _read_disk_cache(cache_key)
+    if payload is not None:
+        return payload
+    
+    # Parse AST
+    try:
+        try:
+            tree = ast.parse(content, filename=str(path), **_PARSE_KW)
+        except SyntaxError as e:
+            # Not UTF-8 and no coding cookie: fall back to latin-1
+            if "can't decode" not in str(e.msg):
+                raise
+            tree = ast.parse(content.decode('latin-1'), filename=str(path), **_PARSE_KW)
+    except SyntaxError as e:
+        return {
+            "success": False,
+            "file_path": str(file_path),
+            "file_name": path.name,
+            "size": file_size,
+            "error": f"Syntax error at line {e.lineno}: {e.msg}"
+        }
+    
+    # Visit AST (classes, functions and imports in a single pass)
+    visitor = ArchitectureVisitor()
+    visitor.visit(tree)
+    
+    payload = json.dumps({
+        "classes": visitor.structure,
+        "global_functions": visitor.global_functions,
+        "imports": list(dict.fromkeys(visitor.imports)),  # Deduplicate, keep order
+    })
+    _write_disk_cache(cache_key, payload)
+    return payload
+
+
+def analyze_files(
+    file_paths: List[str],
+    max_workers: Optional[int] = None,
+    sort_imports: bool = False,
+    detail: Literal['full', 'summary', 'counts'] = 'full'
+) -> List[dict]:
+    """
+    Analyze several Python files, in parallel worker processes.
+    
+    **Use when:**
+    - A tool needs analyze_file() results for many files at once
+    
+    Parsing is CPU-bound and holds the GIL, so files are spread over
+    processes; batches smaller than PARALLEL_MIN_FILES run in-process.
+    
+    Args:
+        file_paths: Paths to .py files
+        max_workers: Worker processes (defaults to the CPU count)
+        sort_imports: Passed through to analyze_file()
+        detail: Passed through to analyze_file()
+        
+    Returns:
+        One analyze_file() result per path, in input order
+    """
+    analyze = functools.partial(analyze_file, sort_imports=sort_imports, detail=detail)
+    workers = min(len(file_paths), max_workers or os.cpu_count() or 1)
+    
+    if len(file_paths) < PARALLEL_MIN_FILES or workers < 2:
+        return [analyze(file_path) for file_path in file_paths]
+    
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze, file_paths, chunksize=chunksize))
+
+
+def _project_fingerprint(path: str) -> tuple:
+    """
+    Cheap change detector for a project's Python sources
+    
+    Walks the tree (skipping the directories the analyzer ignores) and keeps
+    only the file count and newest mtime, so edits, additions and deletions
+    all produce a new value.
+    """
+    root = str(Path(path).resolve())
+    count = 0
+    newest = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in FileSystemVisitor.IGNORED_DIRS]
+        for name in filenames:
+            if name.endswith('.py'):
+                try:
+                    newest = max(newest, os.stat(os.path.join(dirpath, name)).st_mtime_ns)
+                except OSError:
+                    continue
+                count += 1
+    return (root, count, newest)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_analyze(path: str, fingerprint: tuple) -> dict:
+    """Full project analysis, reused while the fingerprint is unchanged (treat as read-only)"""
+    return EnhancedProjectAnalyzer(path).analyze()
+
+
+@dataclass(frozen=True)
+class _ConnectionIndex:
+    """
+    Column-wise view of a project's relationships, most connected first
+    
+    Row i describes one class; neg_totals is ascending, so the classes with
+    at least N connections are the prefix up to bisect_right(neg_totals, -N).
+    """
+    neg_totals: List[int]
+    names: List[str]
+    inherits_counts: List[int]
+    uses_counts: List[int]
+    used_by_counts: List[int]
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_connection_index(path: str, fingerprint: tuple) -> _ConnectionIndex:
+    relationships = _cached_analyze(path, fingerprint).get('relationships') or {}
+    
+    # One pass over the edges gives every class's "used by" count
+    used_by = Counter()
+    for class_info in relationships.values():
+        used_by.update(class_info.get('uses', ()))
+    
+    rows = []
+    for class_name, class_info in relationships.items():
+        inherits_count = len(class_info.get('inherits', []))
+        uses_count = len(class_info.get('uses', []))
+        rows.append((-(inherits_count + uses_count), class_name, inherits_count, uses_count, used_by[class_name]))
+    # Stable sort: ties keep project order
+    rows.sort(key=lambda row: row[0])
+    
+    return _ConnectionIndex(*(list(column) for column in zip(*rows))) if rows else _ConnectionIndex([], [], [], [], [])
+
+
+def _build_minimal(class_name, class_info, total_connections, inherits_count, uses_count, used_by_count):
+    return {
+        "name": class_name,
+        "module": class_info.get('module', 'unknown'),
+        "total_connections": total_connections,
+        "inherits_count": inherits_count,
+        "uses_count": uses_count,
+        "description": class_info.get('description', None)
+    }
+
+
+def _build_with_metrics(class_name, class_info, total_connections, inherits_count, uses_count, used_by_count):
+    return {
+        "name": class_name,
+        "module": class_info.get('module', 'unknown'),
+        "total_connections": total_connections,
+        "inherits_count": inherits_count,
+        "uses_count": uses_count,
+        "description": class_info.get('description', None),
+        "used_by_count": used_by_count,
+        "is_dependency": used_by_count > 0,
+        "is_leaf": uses_count == 0 and inherits_count == 0,
+    }
+
+
 def get_core_classes(
     path: str,
     min_connections: int = 2,
-    include_metrics: bool = True
+    include_metrics: bool = True,
+    top_k: Optional[int] = 50
 ) -> dict:
     """
     Identify most connected classes (architectural hotspots).
@@ -214,6 +481,7 @@ def get_core_classes(
         path: Project root path
         min_connections: Minimum total relationships (inherits + uses)
         include_metrics: Include detailed connection metrics
+        top_k: Return at most this many classes (None = all over the threshold)
         
     Returns:
         {
@@ -261,8 +529,8 @@ def get_core_classes(
     
     try:
         # Use EnhancedProjectAnalyzer for full analysis
-        analyzer = EnhancedProjectAnalyzer(path)
-        result = analyzer.analyze()
+        fingerprint = _project_fingerprint(path)
+        result = _cached_analyze(path, fingerprint)
         
         if not result.get('relationships'):
             return {
@@ -271,51 +539,31 @@ def get_core_classes(
             }
         
         relationships = result['relationships']
+        index = _cached_connection_index(path, fingerprint)
         
-        # Calculate connections for each class
-        core_classes = []
-        
-        for class_name, class_info in relationships.items():
-            inherits_count = len(class_info.get('inherits', []))
-            uses_count = len(class_info.get('uses', []))
-            
-            # Calculate "used by" count if requested
-            used_by_count = 0
-            if include_metrics:
-                for other_class, other_info in relationships.items():
-                    if class_name in other_info.get('uses', []):
-                        used_by_count += 1
-            
-            total_connections = inherits_count + uses_count
-            
-            # Filter by minimum connections
-            if total_connections >= min_connections:
-                class_data = {
-                    "name": class_name,
-                    "module": class_info.get('module', 'unknown'),
-                    "total_connections": total_connections,
-                    "inherits_count": inherits_count,
-                    "uses_count": uses_count,
-                    "description": class_info.get('description', None)
-                }
-                
-                if include_metrics:
-                    class_data["used_by_count"] = used_by_count
-                    class_data["is_dependency"] = used_by_count > 0
-                    class_data["is_leaf"] = uses_count == 0 and inherits_count == 0
-                
-                core_classes.append(class_data)
-        
-        # Sort by total connections (most connected first)
-        core_classes.sort(key=lambda x: x['total_connections'], reverse=True)
+        # Classes over the threshold are a prefix of the index, already
+        # sorted by total connections (most connected first)
+        core_count = bisect.bisect_right(index.neg_totals, -min_connections)
+        builder = _build_with_metrics if include_metrics else _build_minimal
+        core_classes = [
+            builder(
+                index.names[i],
+                relationships[index.names[i]],
+                -index.neg_totals[i],
+                index.inherits_counts[i],
+                index.uses_counts[i],
+                index.used_by_counts[i],
+            )
+            for i in range(core_count if top_k is None else min(core_count, top_k))
+        ]
         
         return {
             "success": True,
             "total_classes": len(relationships),
             "core_classes": core_classes,
-            "core_count": len(core_classes),
+            "core_count": core_count,  # All classes over the threshold, even past top_k
             "threshold": min_connections,
-            "coverage_percentage": round((len(core_classes) / len(relationships)) * 100, 1),
+            "coverage_percentage": round((core_count / len(relationships)) * 100, 1),
             "error": None
         }
         
@@ -327,10 +575,195 @@ def get_core_classes(
         }
 
 
+# ==============================================================================
+# PATTERN DETECTORS - (class_name, bases, methods, module, context)
+# -> (evidence, confidence), looked up once per search_by_pattern call.
+# context is the relationships dict, or what the pattern's entry in
+# _PATTERN_CONTEXT builds from it once per call. Base-name checks search
+# '|'.join(bases) once rather than each base in turn
+# ==============================================================================
+
+_FACTORY_PREFIXES = ('create', 'build', 'get_', 'make')
+
+
+def _detect_factory(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    factory_methods = [m for m in methods if m.startswith(_FACTORY_PREFIXES)]
+    is_factory_name = 'Factory' in class_name
+    
+    if is_factory_name:
+        evidence.append(f"Name contains 'Factory'")
+        confidence = "high"
+    
+    if len(factory_methods) >= 2:
+        evidence.append(f"Has {len(factory_methods)} factory methods: {', '.join(factory_methods[:3])}")
+        if confidence == "low":
+            confidence = "medium"
+    
+    if factory_methods and is_factory_name:
+        confidence = "high"
+    return evidence, confidence
+
+
+def _detect_singleton(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'get_instance' in methods or '_instance' in methods:
+        evidence.append("Has get_instance or _instance method")
+        confidence = "high"
+    
+    if '__new__' in methods:
+        evidence.append("Overrides __new__ (possible singleton)")
+        confidence = "medium"
+    return evidence, confidence
+
+
+def _detect_repository(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'Model' in bases:
+        evidence.append("Inherits from Model")
+        confidence = "high"
+    
+    # Check if it's a Django model with .objects
+    if 'models.Model' in '|'.join(bases):
+        evidence.append("Django Model with objects manager")
+        confidence = "high"
+    return evidence, confidence
+
+
+def _service_modules(relationships):
+    """Modules whose path mentions 'service', lowercasing each distinct module once"""
+    modules = {class_info.get('module', '') for class_info in relationships.values()}
+    return {module for module in modules if 'service' in module.lower()}
+
+
+def _detect_service(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if class_name.endswith('Service'):
+        evidence.append("Name ends with 'Service'")
+        confidence = "high"
+    
+    if module in context:
+        evidence.append("Located in services module")
+        if confidence == "low":
+            confidence = "medium"
+    
+    # Services usually have business logic methods
+    business_methods = [m for m in methods if not m.startswith('_')]
+    if len(business_methods) >= 3:
+        evidence.append(f"Has {len(business_methods)} public methods")
+    return evidence, confidence
+
+
+def _detect_serializer(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'Serializer' in class_name:
+        evidence.append("Name contains 'Serializer'")
+        confidence = "high"
+    
+    if 'Serializer' in '|'.join(bases):
+        evidence.append(f"Inherits from Serializer: {', '.join(bases)}")
+        confidence = "high"
+    return evidence, confidence
+
+
+def _detect_viewset(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'ViewSet' in class_name:
+        evidence.append("Name contains 'ViewSet'")
+        confidence = "high"
+    
+    if 'ViewSet' in '|'.join(bases):
+        evidence.append(f"Inherits from ViewSet: {', '.join(bases)}")
+        confidence = "high"
+    return evidence, confidence
+
+
+def _detect_admin(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'Admin' in class_name:
+        evidence.append("Name contains 'Admin'")
+        confidence = "high"
+    
+    if 'Admin' in '|'.join(bases):  # Covers ModelAdmin
+        evidence.append(f"Inherits from ModelAdmin: {', '.join(bases)}")
+        confidence = "high"
+    return evidence, confidence
+
+
+def _detect_visitor(class_name, bases, methods, module, context):
+    evidence = []
+    confidence = "low"
+    if 'Visitor' in class_name:
+        evidence.append("Name contains 'Visitor'")
+        confidence = "high"
+    
+    if 'Visitor' in '|'.join(bases):
+        evidence.append(f"Inherits from Visitor: {', '.join(bases)}")
+        confidence = "high"
+    
+    visit_methods = [m for m in methods if m.startswith('visit_')]
+    if len(visit_methods) >= 2:
+        evidence.append(f"Has {len(visit_methods)} visit_* methods")
+        if confidence == "low":
+            confidence = "medium"
+    return evidence, confidence
+
+
+def _index_by_bases(relationships):
+    """Group classes by their (unordered) bases: frozenset(bases) -> [(name, frozenset(methods))]"""
+    by_bases = defaultdict(list)
+    for class_name, class_info in relationships.items():
+        by_bases[frozenset(class_info.get('inherits', []))].append(
+            (class_name, frozenset(class_info.get('methods', [])))
+        )
+    return by_bases
+
+
+def _detect_strategy(class_name, bases, methods, module, context):
+    # Strategy pattern needs comparison across classes; context groups them
+    # by bases so only classes sharing this one's interface are compared
+    evidence = []
+    confidence = "low"
+    if len(bases) > 0:
+        # Classes implementing same interface
+        shared_methods = set(methods)
+        for other_class, other_methods in context.get(frozenset(bases), ()):
+            if other_class != class_name and len(shared_methods & other_methods) >= 3:
+                evidence.append(f"Shares interface with {other_class}")
+                confidence = "medium"
+    return evidence, confidence
+
+
+_PATTERN_DETECTORS = {
+    'factory': _detect_factory,
+    'singleton': _detect_singleton,
+    'repository': _detect_repository,
+    'service': _detect_service,
+    'serializer': _detect_serializer,
+    'viewset': _detect_viewset,
+    'admin': _detect_admin,
+    'visitor': _detect_visitor,
+    'strategy': _detect_strategy,
+}
+
+_PATTERN_CONTEXT = {
+    'service': _service_modules,
+    'strategy': _index_by_bases,
+}
+
+
 def search_by_pattern(
     path: str,
     pattern_type: str,
-    include_evidence: bool = True
+    include_evidence: bool = True,
+    top_k: Optional[int] = 50
 ) -> dict:
     """
     Find classes matching design patterns.
@@ -356,6 +789,7 @@ def search_by_pattern(
         path: Project root path
         pattern_type: One of the supported patterns above
         include_evidence: Include why class matches pattern
+        top_k: Return at most this many matches, best first (None = all)
         
     Returns:
         {
@@ -370,7 +804,7 @@ def search_by_pattern(
                     "description": str
                 }
             ],
-            "total_matches": int,
+            "total_matches": int,  # Even past top_k
             "error": str | None
         }
     
@@ -395,23 +829,18 @@ def search_by_pattern(
         }
     """
     
-    SUPPORTED_PATTERNS = {
-        'factory', 'singleton', 'repository', 'service', 
-        'serializer', 'viewset', 'admin', 'visitor', 'strategy'
-    }
-    
     pattern_type = pattern_type.lower()
     
-    if pattern_type not in SUPPORTED_PATTERNS:
+    detector = _PATTERN_DETECTORS.get(pattern_type)
+    if detector is None:
         return {
             "success": False,
-            "error": f"Unsupported pattern: {pattern_type}. Supported: {', '.join(SUPPORTED_PATTERNS)}"
+            "error": f"Unsupported pattern: {pattern_type}. Supported: {', '.join(_PATTERN_DETECTORS)}"
         }
     
     try:
         # Get full analysis
-        analyzer = EnhancedProjectAnalyzer(path)
-        result = analyzer.analyze()
+        result = _cached_analyze(path, _project_fingerprint(path))
         
         if not result.get('relationships'):
             return {
@@ -422,127 +851,19 @@ def search_by_pattern(
         relationships = result['relationships']
         matches = []
         
+        build_context = _PATTERN_CONTEXT.get(pattern_type)
+        context = build_context(relationships) if build_context else relationships
+        
         # Pattern detection logic
         for class_name, class_info in relationships.items():
-            evidence = []
-            confidence = "low"
-            
-            bases = class_info.get('inherits', [])
-            methods = class_info.get('methods', [])
             module = class_info.get('module', '')
-            
-            # FACTORY PATTERN
-            if pattern_type == 'factory':
-                factory_methods = [m for m in methods if m.startswith(('create', 'build', 'get_', 'make'))]
-                
-                if 'Factory' in class_name:
-                    evidence.append(f"Name contains 'Factory'")
-                    confidence = "high"
-                
-                if len(factory_methods) >= 2:
-                    evidence.append(f"Has {len(factory_methods)} factory methods: {', '.join(factory_methods[:3])}")
-                    if confidence == "low":
-                        confidence = "medium"
-                
-                if factory_methods and 'Factory' in class_name:
-                    confidence = "high"
-            
-            # SINGLETON PATTERN
-            elif pattern_type == 'singleton':
-                if 'get_instance' in methods or '_instance' in methods:
-                    evidence.append("Has get_instance or _instance method")
-                    confidence = "high"
-                
-                if '__new__' in methods:
-                    evidence.append("Overrides __new__ (possible singleton)")
-                    confidence = "medium"
-            
-            # REPOSITORY PATTERN (Django)
-            elif pattern_type == 'repository':
-                if 'Model' in bases:
-                    evidence.append("Inherits from Model")
-                    confidence = "high"
-                
-                # Check if it's a Django model with .objects
-                if 'models.Model' in str(bases):
-                    evidence.append("Django Model with objects manager")
-                    confidence = "high"
-            
-            # SERVICE PATTERN
-            elif pattern_type == 'service':
-                if class_name.endswith('Service'):
-                    evidence.append("Name ends with 'Service'")
-                    confidence = "high"
-                
-                if 'service' in module.lower():
-                    evidence.append("Located in services module")
-                    if confidence == "low":
-                        confidence = "medium"
-                
-                # Services usually have business logic methods
-                business_methods = [m for m in methods if not m.startswith('_')]
-                if len(business_methods) >= 3:
-                    evidence.append(f"Has {len(business_methods)} public methods")
-            
-            # SERIALIZER PATTERN (DRF)
-            elif pattern_type == 'serializer':
-                if 'Serializer' in class_name:
-                    evidence.append("Name contains 'Serializer'")
-                    confidence = "high"
-                
-                if any('Serializer' in base for base in bases):
-                    evidence.append(f"Inherits from Serializer: {', '.join(bases)}")
-                    confidence = "high"
-            
-            # VIEWSET PATTERN (DRF)
-            elif pattern_type == 'viewset':
-                if 'ViewSet' in class_name:
-                    evidence.append("Name contains 'ViewSet'")
-                    confidence = "high"
-                
-                if any('ViewSet' in base for base in bases):
-                    evidence.append(f"Inherits from ViewSet: {', '.join(bases)}")
-                    confidence = "high"
-            
-            # ADMIN PATTERN (Django)
-            elif pattern_type == 'admin':
-                if 'Admin' in class_name:
-                    evidence.append("Name contains 'Admin'")
-                    confidence = "high"
-                
-                if any('ModelAdmin' in base or 'Admin' in base for base in bases):
-                    evidence.append(f"Inherits from ModelAdmin: {', '.join(bases)}")
-                    confidence = "high"
-            
-            # VISITOR PATTERN
-            elif pattern_type == 'visitor':
-                if 'Visitor' in class_name:
-                    evidence.append("Name contains 'Visitor'")
-                    confidence = "high"
-                
-                if any('Visitor' in base for base in bases):
-                    evidence.append(f"Inherits from Visitor: {', '.join(bases)}")
-                    confidence = "high"
-                
-                visit_methods = [m for m in methods if m.startswith('visit_')]
-                if len(visit_methods) >= 2:
-                    evidence.append(f"Has {len(visit_methods)} visit_* methods")
-                    if confidence == "low":
-                        confidence = "medium"
-            
-            # STRATEGY PATTERN (detected across multiple classes)
-            elif pattern_type == 'strategy':
-                # Strategy pattern needs comparison across classes
-                # This is more complex - simplified version
-                if len(bases) > 0:
-                    # Classes implementing same interface
-                    shared_methods = set(methods)
-                    for other_class, other_info in relationships.items():
-                        if other_class != class_name and set(bases) == set(other_info.get('inherits', [])):
-                            other_methods = set(other_info.get('methods', []))
-                            if len(shared_methods & other_methods) >= 3:
-                                evidence.append(f"Shares interface with {other_class}")
-                                confidence = "medium"
+            evidence, confidence = detector(
+                class_name,
+                class_info.get('inherits', []),
+                class_info.get('methods', []),
+                module,
+                context,
+            )
             
             # Add to matches if evidence found
             if evidence:
@@ -558,13 +879,18 @@ def search_by_pattern(
                 
                 matches.append(match_data)
         
+        # Stable either way: ties keep project order
         confidence_order = {"high": 0, "medium": 1, "low": 2}
-        matches.sort(key=lambda x: confidence_order[x['confidence']])
+        by_confidence = lambda x: confidence_order[x['confidence']]
+        if top_k is None:
+            ranked = sorted(matches, key=by_confidence)
+        else:
+            ranked = heapq.nsmallest(top_k, matches, key=by_confidence)
         
         return {
             "success": True,
             "pattern": pattern_type,
-            "matches": matches,
+            "matches": ranked,
             "total_matches": len(matches),
             "total_classes_analyzed": len(relationships),
             "error": None
@@ -1,15 +1,18 @@
 """
 Chat service using LangChain for conversational AI with RAG
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
+import threading
 import uuid
 
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Now
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableParallel, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain_community.chat_message_histories import ChatMessageHistory
 
 from core.llm_factory.factory import LLMFactory, LLMConfig
 from core.llm_factory.providers import VectorStoreProvider
@@ -17,6 +20,12 @@ from core.models import ChatSession, ChatMessage
 
 logger = logging.getLogger(__name__)
 
+# Retriever and chains per (llm, vector store) pair. They hold no per-session
+# state, so every ChatbotService over the same clients shares one set. Entries
+# keep the llm and store alive, which keeps the id() keys valid
+_chains: Dict[Tuple[int, int], Tuple] = {}
+_chains_lock = threading.Lock()
+
 
 class ChatbotService:
     """Service for handling chatbot conversations with codebase context"""
@@ -36,6 +45,12 @@ When answering:
 4. If you're not sure about something, say so
 5. Use the context from the codebase to give accurate answers"""
     
+    # Compiled once with the class rather than per chain
+    PROMPT = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT + "\n\nUse the following context to answer the question:\n\n{context}"),
+        ("human", "{question}"),
+    ])
+    
     def __init__(self, session_id: str, use_postgres: bool = True):
         """
         Initialize the chatbot service
@@ -76,54 +91,65 @@ When answering:
                 embeddings=self.embeddings
             )
         
-        # Create retriever
-        self.retriever = self.vector_store.as_retriever(
-            search_kwargs={"k": LLMConfig.DEFAULT_TOP_K}
+        # Retriever and RAG chain, shared with other sessions on the same clients
+        self.retriever, self.answer_chain, self.chain = self._shared_chains(
+            self.llm, self.vector_store
         )
-        
-        # Initialize chat history
-        self.chat_history = ChatMessageHistory()
-        
-        # Load existing chat history
-        self._load_chat_history()
-        
-        # Create the RAG chain
-        self.chain = self._create_chain()
     
-    def _create_chain(self):
-        """Create a simple RAG chain using LCEL"""
-        
-        # Define the prompt template
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", self.SYSTEM_PROMPT + "\n\nUse the following context to answer the question:\n\n{context}"),
-            ("human", "{question}"),
-        ])
+    @classmethod
+    def _shared_chains(cls, llm, vector_store) -> Tuple:
+        """Retriever, answer chain and RAG chain for these clients, built once"""
+        key = (id(llm), id(vector_store))
+        with _chains_lock:
+            entry = _chains.get(key)
+            if entry is None:
+                retriever = vector_store.as_retriever(
+                    search_kwargs={"k": LLMConfig.DEFAULT_TOP_K}
+                )
+                entry = _chains[key] = (llm, vector_store, retriever, *cls._create_chains(llm, retriever))
+        return entry[2:]
+    
+    @classmethod
+    def _create_chains(cls, llm, retriever) -> Tuple:
+        """Create the answer chain and a simple RAG chain using LCEL"""
         
-        def format_docs(docs):
-            """Format documents for context"""
-            return "\n\n".join(doc.page_content for doc in docs)
+        # Answer chain over an already-retrieved context (used for streaming)
+        answer_chain = cls.PROMPT | llm | StrOutputParser()
         
-        # Create RAG chain using LCEL
-        rag_chain = (
-            {"context": self.retriever | format_docs, "question": RunnablePassthrough()}
-            | prompt
-            | self.llm
-            | StrOutputParser()
+        # Create RAG chain using LCEL. The retrieved docs are passed through
+        # next to the answer, so sources need no second retriever call
+        rag_chain = RunnableParallel(
+            docs=retriever, question=RunnablePassthrough()
+        ).assign(
+            answer=(
+                lambda x: {"context": cls._format_docs(x["docs"]), "question": x["question"]}
+            ) | answer_chain
         )
         
-        return rag_chain
+        return answer_chain, rag_chain
     
-    def _load_chat_history(self):
-        """Load existing chat history from database into chat history"""
-        messages = ChatMessage.objects.filter(
-            session=self.session
-        ).order_by('created_at')
-        
-        for msg in messages:
-            if msg.role == 'user':
-                self.chat_history.add_user_message(msg.content)
-            elif msg.role == 'assistant':
-                self.chat_history.add_ai_message(msg.content)
+    @staticmethod
+    def _format_docs(docs) -> str:
+        """Format documents for context"""
+        return "\n\n".join(doc.page_content for doc in docs)
+    
+    @staticmethod
+    def _format_sources(docs) -> List[Dict[str, Any]]:
+        """
+        Extract source information from retrieved documents. Empty metadata
+        fields are left out, which keeps the stored JSONB small.
+        """
+        sources = []
+        for doc in docs:
+            metadata = doc.metadata
+            content = doc.page_content
+            source = {
+                'file_path': metadata.get('file_path'),
+                'file_name': metadata.get('file_name'),
+                'content_preview': content[:200] + '...' if len(content) > 200 else content,
+            }
+            sources.append({key: value for key, value in source.items() if value})
+        return sources
     
     def chat(self, message: str) -> Dict[str, Any]:
         """
@@ -137,43 +163,16 @@ When answering:
         """
         logger.info(f"Processing message for session {self.session_id}")
         
-        # Save user message
-        user_msg = ChatMessage.objects.create(
-            session=self.session,
-            role='user',
-            content=message
-        )
-        
         try:
-            # Get response from chain
-            answer = self.chain.invoke(message)
-            
-            # Get source documents directly from retriever for metadata
-            source_docs = self.retriever.invoke(message)
+            # Get response and the documents it was grounded on from the chain
+            result = self.chain.invoke(message)
+            answer = result['answer']
             
             # Extract source information
-            sources = []
-            for doc in source_docs:
-                sources.append({
-                    'file_path': doc.metadata.get('file_path', ''),
-                    'file_name': doc.metadata.get('file_name', ''),
-                    'content_preview': doc.page_content[:200] + '...' if len(doc.page_content) > 200 else doc.page_content,
-                })
-            
-            # Add messages to chat history
-            self.chat_history.add_user_message(message)
-            self.chat_history.add_ai_message(answer)
-            
-            # Save assistant message
-            assistant_msg = ChatMessage.objects.create(
-                session=self.session,
-                role='assistant',
-                content=answer,
-                sources=sources
-            )
+            sources = self._format_sources(result['docs'])
             
-            # Update session timestamp
-            self.session.save()
+            # Save both messages and update the session timestamp
+            assistant_msg = self._save_turn(message, answer, sources)
             
             return {
                 'message': answer,
@@ -185,6 +184,58 @@ When answering:
             logger.error(f"Error processing chat message: {str(e)}")
             raise
     
+    def chat_stream(self, message: str) -> Iterator[Dict[str, Any]]:
+        """
+        Send a message and stream the response as it is generated
+        
+        Args:
+            message: User message
+            
+        Yields:
+            ``{'delta': text}`` for each generated chunk, then a final
+            ``{'done': True, 'sources': [...], 'message_id': ...}`` event
+        """
+        logger.info(f"Streaming message for session {self.session_id}")
+        
+        # Retrieve once; the documents feed both the prompt and the sources
+        source_docs = self.retriever.invoke(message)
+        context = self._format_docs(source_docs)
+        
+        chunks = []
+        for chunk in self.answer_chain.stream({"context": context, "question": message}):
+            chunks.append(chunk)
+            yield {'delta': chunk}
+        answer = ''.join(chunks)
+        
+        sources = self._format_sources(source_docs)
+        
+        # Save both messages and update the session timestamp
+        assistant_msg = self._save_turn(message, answer, sources)
+        
+        yield {
+            'done': True,
+            'sources': sources,
+            'message_id': str(assistant_msg.id),
+        }
+    
+    def _save_turn(self, message: str, answer: str, sources: List[Dict[str, Any]]) -> ChatMessage:
+        """
+        Store a user message and its answer in one INSERT, and touch the
+        session, in a single transaction. Returns the assistant message.
+        """
+        with transaction.atomic():
+            # Built in order, so the user message gets the earlier uuid7/created_at
+            user_msg, assistant_msg = ChatMessage.objects.bulk_create([
+                ChatMessage(session=self.session, role='user', content=message),
+                ChatMessage(session=self.session, role='assistant', content=answer, sources=sources),
+            ])
+            self._touch_session()
+        return assistant_msg
+    
+    def _touch_session(self):
+        """Mark the session active with a single-column UPDATE"""
+        ChatSession.objects.filter(pk=self.session.pk).update(updated_at=Now())
+    
     def get_history(self) -> List[Dict[str, Any]]:
         """
         Get chat history for the session
@@ -194,23 +245,36 @@ When answering:
         """
         messages = ChatMessage.objects.filter(
             session=self.session
-        ).order_by('created_at')
+        ).order_by('created_at').values_list('id', 'role', 'content', 'sources', 'created_at')
         
         return [
             {
-                'id': str(msg.id),
-                'role': msg.role,
-                'content': msg.content,
-                'sources': msg.sources,
-                'created_at': msg.created_at.isoformat(),
+                'id': str(msg_id),
+                'role': role,
+                'content': content,
+                'sources': sources,
+                'created_at': created_at.isoformat(),
             }
-            for msg in messages
+            for msg_id, role, content, sources, created_at in messages
         ]
     
     def clear_history(self):
         """Clear chat history"""
         ChatMessage.objects.filter(session=self.session).delete()
-        self.memory.clear()
+    
+    @staticmethod
+    def clear_histories(session_ids: List[str]) -> int:
+        """
+        Clear chat history for several sessions in one query
+        
+        Args:
+            session_ids: Session UUIDs to clear
+            
+        Returns:
+            Number of messages deleted
+        """
+        deleted, _ = ChatMessage.objects.filter(session_id__in=session_ids).delete()
+        return deleted
     
     @staticmethod
     def create_session(title: str = "") -> ChatSession:
@@ -233,15 +297,18 @@ When answering:
         Returns:
             List of session dictionaries
         """
-        sessions = ChatSession.objects.all()
+        # One query with the count annotated, read as tuples (no model instances)
+        sessions = ChatSession.objects.annotate(message_count=Count('messages')).values_list(
+            'id', 'title', 'created_at', 'updated_at', 'message_count'
+        )
         
         return [
             {
-                'id': str(session.id),
-                'title': session.title,
-                'created_at': session.created_at.isoformat(),
-                'updated_at': session.updated_at.isoformat(),
-                'message_count': session.messages.count(),
+                'id': str(session_id),
+                'title': title,
+                'created_at': created_at.isoformat(),
+                'updated_at': updated_at.isoformat(),
+                'message_count': message_count,
             }
-            for session in sessions
+            for session_id, title, created_at, updated_at, message_count in sessions
         ]
\ No newline at end of file
@@ -1,3 +1,11 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+
 def find_entry_points(path: str) -> dict:
     """
     Identify main application entry points.
@@ -45,12 +53,21 @@ def find_entry_points(path: str) -> dict:
         ],
     }
     
+    # Every check below is answered from one pruned walk of the tree:
+    # direct paths by relative path, "**/name.py" patterns by file name
+    by_path = {}
+    by_name = {}
+    for entry in _walk_py(str(root)):
+        file_path = Path(entry.path)
+        by_path[file_path.relative_to(root).as_posix()] = file_path
+        by_name.setdefault(entry.name, []).append(file_path)
+    
     # Detect project type
-    if (root / "manage.py").exists():
+    if "manage.py" in by_path:
         project_type = "django"
-    elif any((root / "main.py").exists(), (root / "app" / "main.py").exists()):
+    elif "main.py" in by_path or "app/main.py" in by_path:
         project_type = "fastapi"
-    elif (root / "app.py").exists():
+    elif "app.py" in by_path:
         project_type = "flask"
     
     # Find entry points
@@ -58,21 +75,21 @@ def find_entry_points(path: str) -> dict:
         for pattern, description in pattern_list:
             if "*" in pattern:
                 # Glob pattern
-                matches = list(root.glob(pattern))
+                matches = by_name.get(pattern.removeprefix("**/"), [])
             else:
                 # Direct path
-                matches = [root / pattern] if (root / pattern).exists() else []
+                matches = [by_path[pattern]] if pattern in by_path else []
             
+            # The walk only yields files, so no is_file() check is needed
             for match in matches:
-                if match.is_file():
-                    entry_points.append({
-                        "type": pattern_type,
-                        "path": str(match.relative_to(root)),
-                        "description": description
-                    })
+                entry_points.append({
+                    "type": pattern_type,
+                    "path": str(match.relative_to(root)),
+                    "description": description
+                })
     
     # Add __main__.py if exists
-    if (root / "__main__.py").exists():
+    if "__main__.py" in by_path:
         entry_points.append({
             "type": "python_main",
             "path": "__main__.py",
@@ -87,6 +104,188 @@ def find_entry_points(path: str) -> dict:
     }
 
 
+# Below this many files, thread pool startup costs more than it saves
+PARALLEL_MIN_FILES = 8
+
+# Directories never worth descending into when looking for modules
+_PRUNED_DIRS = frozenset({
+    "__pycache__", ".git", "node_modules", ".venv", "venv", ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", "build", "dist",
+})
+
+
+def _walk_py(root: str):
+    """
+    Yield a DirEntry for every .py file under root, pruning _PRUNED_DIRS.
+    
+    os.scandir hands back the file type with each entry, so no directory
+    costs an extra stat and pruned trees are never listed at all.
+    """
+    import os
+    
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _PRUNED_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith('.py') and entry.is_file():
+                        yield entry
+        except OSError:
+            continue
+
+
+# class/def/import/from at the start of a line, on raw bytes. Non-ASCII
+# bytes count as word characters, like str \w on UTF-8 names
+_LINE_START_RE = re.compile(
+    rb'^(?:(class)\s+[\w\x80-\xff]'
+    rb'|(def)\s+[\w\x80-\xff]'
+    rb'|import\s+([\w.\x80-\xff]+)'
+    rb'|from\s+([\w.\x80-\xff]+)\s+import)',
+    re.MULTILINE,
+)
+
+
+def _scan_source(data: bytes) -> dict:
+    """
+    Count top-level classes/functions and collect imports in one pass over raw bytes.
+    
+    A single alternation anchored at line starts replaces one regex pass per
+    statement kind, and works on the bytes as read (no decode).
+    """
+    classes = functions = 0
+    imports = set()
+    for is_class, is_def, imported, from_module in _LINE_START_RE.findall(data):
+        if is_class:
+            classes += 1
+        elif is_def:
+            functions += 1
+        else:
+            imports.add((imported or from_module).decode('utf-8', 'replace'))
+    
+    return {
+        "lines": data.count(b'\n'),
+        "classes": classes,
+        "functions": functions,
+        "imports": imports,
+    }
+
+
+# Per-file results (metadata, module stats) persisted across runs, keyed by
+# (path, kind) and valid while the file's mtime and size are unchanged.
+# Bump the version when the shape of a cached result changes.
+_FILE_CACHE_NAME = "filemeta.sqlite"
+_FILE_CACHE_VERSION = 1
+# One connection per thread: sqlite3 connections can't be shared across threads
+_file_cache_local = threading.local()
+
+
+def user_cache_dir() -> Path:
+    """
+    Per-user cache directory, created with owner-only access (0700).
+    
+    $XDG_CACHE_HOME/docai (default ~/.cache/docai) rather than the shared
+    temp dir, where another user could pre-create the directory or plant
+    entries and feed crafted results back to us. Shared by every on-disk
+    cache in these tools.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    cache_dir = Path(cache_home) / "docai"
+    cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # mkdir leaves an existing directory's mode alone
+    cache_dir.chmod(0o700)
+    return cache_dir
+
+
+def _file_cache_db() -> sqlite3.Connection:
+    db = getattr(_file_cache_local, "db", None)
+    if db is None:
+        db = sqlite3.connect(str(user_cache_dir() / _FILE_CACHE_NAME), timeout=30, isolation_level=None)
+        # WAL: readers on the thread pool don't block on each other's writes
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS file_cache ("
+            " path TEXT, kind TEXT, mtime_ns INTEGER, size INTEGER, result TEXT,"
+            " PRIMARY KEY (path, kind))"
+        )
+        _file_cache_local.db = db
+    return db
+
+
+def _file_cache_get(path: str, kind: str, stat) -> dict | None:
+    try:
+        row = _file_cache_db().execute(
+            "SELECT result FROM file_cache WHERE path = ? AND kind = ? AND mtime_ns = ? AND size = ?",
+            (path, f"{kind}-v{_FILE_CACHE_VERSION}", stat.st_mtime_ns, stat.st_size),
+        ).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def _file_cache_put(path: str, kind: str, stat, result: dict):
+    # A cache that can't be written just means recomputing next time
+    try:
+        _file_cache_db().execute(
+            "INSERT OR REPLACE INTO file_cache VALUES (?, ?, ?, ?, ?)",
+            (path, f"{kind}-v{_FILE_CACHE_VERSION}", stat.st_mtime_ns, stat.st_size, json.dumps(result)),
+        )
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _map_threaded(func, items: list) -> list:
+    """
+    map() over a thread pool, results in input order.
+    
+    For per-file work dominated by stat/read syscalls, which release the GIL.
+    Batches smaller than PARALLEL_MIN_FILES run inline.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    
+    workers = min(len(items), 32, (os.cpu_count() or 1) * 4)
+    if len(items) < PARALLEL_MIN_FILES or workers < 2:
+        return [func(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def _module_info(found: tuple, root, include_stats: bool) -> dict:
+    """One list_modules() entry, from a (path, stat result or None) pair"""
+    py_file, stat = found
+    if stat is None:
+        stat = py_file.stat()
+    module_info = {
+        "path": str(py_file.relative_to(root)),
+        "name": py_file.name,
+        "size": stat.st_size
+    }
+    
+    # Quick stats without full AST parsing
+    if include_stats:
+        try:
+            # Line-start counts on the raw bytes (not perfect but fast),
+            # unless the file is unchanged since they were last cached
+            counts = _file_cache_get(str(py_file), "module_stats", stat)
+            if counts is None:
+                stats = _scan_source(py_file.read_bytes())
+                counts = {key: stats[key] for key in ("lines", "classes", "functions")}
+                _file_cache_put(str(py_file), "module_stats", stat, counts)
+            module_info.update(counts)
+            
+        except Exception:
+            module_info["lines"] = 0
+            module_info["classes"] = 0
+            module_info["functions"] = 0
+    
+    return module_info
+
+
 def list_modules(
     path: str,
     pattern: str = "**/*.py",
@@ -102,7 +301,7 @@ def list_modules(
         pattern: Glob pattern (default: **/*.py for recursive)
         exclude_tests: Skip test files
         exclude_private: Skip __pycache__, __init__.py
-        include_stats: Calculate LOC and class count (fast regex)
+        include_stats: Calculate LOC and class count (single byte scan)
         
     Returns:
         {
@@ -121,44 +320,26 @@ def list_modules(
             ]
         }
     """
-    import re
+    import functools
     from pathlib import Path
     
     root = Path(path).resolve()
-    modules = []
     
-    # Find all Python files
-    py_files = root.glob(pattern)
+    # Find all Python files, then apply filters. The default recursive
+    # pattern uses the pruned scandir walk; other patterns go through glob
+    if pattern == "**/*.py":
+        found = [(Path(entry.path), entry.stat()) for entry in _walk_py(str(root))]
+    else:
+        found = [(py_file, None) for py_file in root.glob(pattern)]
+    py_files = [
+        (py_file, size) for py_file, size in found
+        if not (exclude_tests and ("test_" in py_file.name or "/tests/" in str(py_file)))
+        and not (exclude_private and ("__pycache__" in str(py_file)))
+    ]
     
-    for py_file in py_files:
-        # Apply filters
-        if exclude_tests and ("test_" in py_file.name or "/tests/" in str(py_file)):
-            continue
-        if exclude_private and ("__pycache__" in str(py_file)):
-            continue
-        
-        module_info = {
-            "path": str(py_file.relative_to(root)),
-            "name": py_file.name,
-            "size": py_file.stat().st_size
-        }
-        
-        # Quick stats without full AST parsing
-        if include_stats:
-            try:
-                content = py_file.read_text(encoding='utf-8')
-                
-                # Fast regex counts (not perfect but fast)
-                module_info["lines"] = content.count('\n')
-                module_info["classes"] = len(re.findall(r'^class\s+\w+', content, re.MULTILINE))
-                module_info["functions"] = len(re.findall(r'^def\s+\w+', content, re.MULTILINE))
-                
-            except Exception:
-                module_info["lines"] = 0
-                module_info["classes"] = 0
-                module_info["functions"] = 0
-        
-        modules.append(module_info)
+    # Per-file work is mostly stat/read syscalls, so threads overlap it
+    module_info = functools.partial(_module_info, root=root, include_stats=include_stats)
+    modules = _map_threaded(module_info, py_files)
     
     return {
         "success": True,
@@ -190,7 +371,6 @@ def get_file_metadata(file_path: str, include_imports: bool = True) -> dict:
         }
     """
     import hashlib
-    import re
     from datetime import datetime
     from pathlib import Path
     
@@ -203,37 +383,53 @@ def get_file_metadata(file_path: str, include_imports: bool = True) -> dict:
                 "error": f"File not found: {file_path}"
             }
         
-        # Basic file stats
+        # Unchanged since the last call (same mtime and size): reuse it
         stat = file_path.stat()
-        content = file_path.read_text(encoding='utf-8')
+        cache_kind = "metadata+imports" if include_imports else "metadata"
+        cached = _file_cache_get(str(file_path), cache_kind, stat)
+        if cached is not None:
+            return cached
+        
+        # Basic file stats; lines, hash and imports all come from one buffer.
+        # The hash covers the raw bytes, so it doesn't depend on decoding
+        data = file_path.read_bytes()
         
         result = {
             "success": True,
             "path": str(file_path),
             "name": file_path.name,
             "size": stat.st_size,
-            "lines": content.count('\n'),
+            "lines": data.count(b'\n'),
             "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "hash": hashlib.sha256(content.encode()).hexdigest()[:16]
+            "hash": hashlib.sha256(data).hexdigest()[:16]
         }
         
-        # Fast import extraction (regex, not AST)
+        # Fast import extraction (byte scan, not AST)
         if include_imports:
-            import_patterns = [
-                r'^import\s+([\w\.]+)',
-                r'^from\s+([\w\.]+)\s+import',
-            ]
-            imports = set()
-            for pattern in import_patterns:
-                matches = re.findall(pattern, content, re.MULTILINE)
-                imports.update(matches)
-            
-            result["imports"] = sorted(list(imports))
+            result["imports"] = sorted(_scan_source(data)["imports"])
         
+        _file_cache_put(str(file_path), cache_kind, stat, result)
         return result
         
     except Exception as e:
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+def get_files_metadata(file_paths: list, include_imports: bool = True) -> list:
+    """
+    get_file_metadata() for several files, read on a thread pool.
+    
+    Args:
+        file_paths: Paths to Python files
+        include_imports: Passed through to get_file_metadata()
+        
+    Returns:
+        One get_file_metadata() result per path, in input order
+    """
+    import functools
+    
+    metadata = functools.partial(get_file_metadata, include_imports=include_imports)
+    return _map_threaded(metadata, list(file_paths))
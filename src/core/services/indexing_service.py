@@ -2,15 +2,20 @@
 Document indexing service using LlamaIndex
 Indexes the codebase for RAG-based chatbot
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 import logging
-from datetime import datetime
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import django
+from django.db.models import F
 
 from llama_index.core import VectorStoreIndex, StorageContext, Document as LlamaDocument
-from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.core.schema import TextNode
+from llama_index.core.schema import BaseNode, MetadataMode, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
 
 from core.llm_factory.factory import LLMFactory, LLMConfig
 from core.llm_factory.providers import VectorStoreProvider, VectorStoreConfig
@@ -23,6 +28,10 @@ logger = logging.getLogger(__name__)
 class CodebaseIndexer:
     """Service for indexing codebase using LlamaIndex"""
     
+    # Write job progress at most this often (whichever comes first)
+    PROGRESS_UPDATE_FILES = 500
+    PROGRESS_UPDATE_SECONDS = 2.0
+    
     def __init__(self, use_postgres: bool = True):
         """
         Initialize the indexer
@@ -41,7 +50,9 @@ class CodebaseIndexer:
         )
         
         # Get embeddings
-        self.embed_model = LLMFactory.get_llama_index_embeddings()
+        self.embed_model = LLMFactory.get_llama_index_embeddings(
+            embed_batch_size=LLMConfig.DEFAULT_EMBED_BATCH_SIZE,
+        )
         
         # Initialize vector store
         if use_postgres:
@@ -55,15 +66,13 @@ class CodebaseIndexer:
         )
         
         # Node parser
-        self.node_parser = SimpleNodeParser.from_defaults(
-            chunk_size=LLMConfig.DEFAULT_CHUNK_SIZE,
-            chunk_overlap=LLMConfig.DEFAULT_CHUNK_OVERLAP,
-        )
+        self.node_parser = LLMFactory.get_fast_text_splitter()
     
     def index_codebase(
         self,
         root_path: str,
-        job_id: Optional[str] = None
+        job_id: Optional[str] = None,
+        workers: int = 1
     ) -> Dict[str, Any]:
         """
         Index the entire codebase
@@ -71,6 +80,7 @@ class CodebaseIndexer:
         Args:
             root_path: Root path of the project
             job_id: Optional indexing job ID for tracking
+            workers: Number of worker processes to shard files across
             
         Returns:
             Dictionary with indexing results
@@ -78,6 +88,7 @@ class CodebaseIndexer:
         logger.info(f"Starting codebase indexing from {root_path}")
         
         # Update job status
+        job = None
         if job_id:
             job = IndexingJob.objects.get(id=job_id)
             job.status = 'running'
@@ -97,78 +108,10 @@ class CodebaseIndexer:
                 job.total_files = total_files
                 job.save()
             
-            # Process files
-            # Collect all documents first
-            documents = []
-            processed_count = 0
-            
-            for file_path in files:
-                try:
-                    docs = self._process_file(file_path)
-                    documents.extend(docs)
-                    processed_count += 1
-                    
-                    if job_id and processed_count % 10 == 0:
-                        job.processed_files = processed_count
-                        job.save()
-                        
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {str(e)}")
-                    continue
-            
-            # Process documents in SMALL batches to respect rate limits (40k TPM limit)
-            # Each chunk is ~512 tokens, so 5 docs = ~2500 tokens per batch (safe margin)
-            logger.info(f"Creating index with {len(documents)} document chunks")
-            batch_size = 5  # Small batches to stay under rate limits
-            batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
-            
-            logger.info(f"Processing {len(batches)} batches of documents (batch_size={batch_size})")
-            
-            # Process first batch to create index
-            if batches:
-                logger.info(f"Processing batch 1/{len(batches)} ({len(batches[0])} documents)")
-                index = VectorStoreIndex.from_documents(
-                    batches[0],
-                    storage_context=self.storage_context,
-                    embed_model=self.embed_model,
-                )
-                
-                # Add remaining batches with delays to respect rate limits
-                for i, batch in enumerate(batches[1:], start=2):
-                    logger.info(f"Processing batch {i}/{len(batches)} ({len(batch)} documents)")
-                    
-                    # Wait 2 seconds between batches to stay under 40k TPM
-                    time.sleep(2)
-                    
-                    # Insert documents one at a time with small delay
-                    for doc in batch:
-                        try:
-                            index.insert(doc)
-                            time.sleep(0.3)  # Small delay between individual docs
-                        except Exception as e:
-                            if "429" in str(e) or "rate_limit" in str(e).lower():
-                                logger.warning(f"Rate limited, waiting 60 seconds...")
-                                time.sleep(60)
-                                index.insert(doc)  # Retry
-                            else:
-                                raise
-                    
-                    # Update progress
-                    if job_id:
-                        progress = (i / len(batches)) * 100
-                        job.metadata = {
-                            'progress': f"{progress:.1f}%",
-                            'batches_processed': i,
-                            'total_batches': len(batches),
-                        }
-                        job.save()
+            if workers > 1:
+                processed_count, total_chunks, batches = self._index_in_parallel(files, workers, job)
             else:
-                # No documents to index
-                index = VectorStoreIndex.from_documents(
-                    [],
-                    storage_context=self.storage_context,
-                    embed_model=self.embed_model,
-                )
+                processed_count, total_chunks, batches = self.index_files(files, job)
             
             # Update job
             if job_id:
@@ -176,9 +119,9 @@ class CodebaseIndexer:
                 job.processed_files = processed_count
                 job.completed_at = datetime.now()
                 job.metadata = {
-                    'total_chunks': len(documents),
+                    'total_chunks': total_chunks,
                     'total_files': total_files,
-                    'batches_processed': len(batches),
+                    'batches_processed': batches,
                 }
                 job.save()
             
@@ -186,8 +129,8 @@ class CodebaseIndexer:
                 'status': 'success',
                 'total_files': total_files,
                 'processed_files': processed_count,
-                'total_chunks': len(documents),
-                'batches': len(batches),
+                'total_chunks': total_chunks,
+                'batches': batches,
             }
             
         except Exception as e:
@@ -201,6 +144,193 @@ class CodebaseIndexer:
             
             raise
     
+    def index_files(
+        self,
+        files: List[str],
+        job: Optional[IndexingJob] = None,
+        shard_of_job: Optional[Any] = None
+    ) -> Tuple[int, int, int]:
+        """
+        Read, split, embed and store files in this process
+        
+        Args:
+            files: Paths to index
+            job: Optional job to report progress on
+            shard_of_job: Primary key of a job these files are one shard of;
+                progress is added to its processed_files instead
+            
+        Returns:
+            (files processed, chunks stored, batches stored)
+        """
+        # Work file by file, so only one batch of chunks is held in memory
+        total_files = len(files)
+        processed_count = 0
+        total_chunks = 0
+        batches = 0
+        reported_count = 0
+        reported_at = time.monotonic()
+        
+        for processed_count, batch in self._iter_node_batches(files, LLMConfig.DEFAULT_EMBED_BATCH_SIZE):
+            if not batch:
+                continue
+            
+            batches += 1
+            total_chunks += len(batch)
+            logger.info(f"Processing batch {batches} ({len(batch)} chunks, {processed_count}/{total_files} files)")
+            self.store_nodes(batch)
+            
+            # Update progress; a narrow UPDATE, throttled, instead of a
+            # full-row save per batch
+            if (job or shard_of_job is not None) and (
+                processed_count - reported_count >= self.PROGRESS_UPDATE_FILES
+                or time.monotonic() - reported_at >= self.PROGRESS_UPDATE_SECONDS
+            ):
+                if job:
+                    IndexingJob.objects.filter(pk=job.pk).update(
+                        processed_files=processed_count,
+                        metadata={
+                            'progress': f"{(processed_count / total_files) * 100:.1f}%",
+                            'batches_processed': batches,
+                            'chunks_processed': total_chunks,
+                        },
+                    )
+                else:
+                    # Other shards write the same row: add, don't overwrite
+                    IndexingJob.objects.filter(pk=shard_of_job).update(
+                        processed_files=F('processed_files') + (processed_count - reported_count),
+                    )
+                reported_count = processed_count
+                reported_at = time.monotonic()
+        
+        if shard_of_job is not None and processed_count > reported_count:
+            IndexingJob.objects.filter(pk=shard_of_job).update(
+                processed_files=F('processed_files') + (processed_count - reported_count),
+            )
+        
+        return processed_count, total_chunks, batches
+    
+    def _index_in_parallel(
+        self,
+        files: List[str],
+        workers: int,
+        job: Optional[IndexingJob] = None
+    ) -> Tuple[int, int, int]:
+        """
+        Shard files across worker processes, each with its own connections
+        
+        Args:
+            files: Paths to index
+            workers: Number of worker processes
+            job: Optional job to report progress on
+            
+        Returns:
+            (files processed, chunks stored, batches stored)
+        """
+        # Round-robin so each shard gets a mix of directories
+        shards = [shard for shard in (files[i::workers] for i in range(workers)) if shard]
+        processed_count = 0
+        total_chunks = 0
+        batches = 0
+        
+        # Workers add their throttled progress to the job row as they go;
+        # all shards finish at about the same time, so waiting for them
+        # would report nothing until the end
+        job_pk = job.pk if job else None
+        if job:
+            IndexingJob.objects.filter(pk=job_pk).update(processed_files=0)
+        
+        # spawn rather than fork, so no process inherits the parent's sockets
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        ) as executor:
+            futures = [executor.submit(_index_shard, shard, self.use_postgres, job_pk) for shard in shards]
+            for future in as_completed(futures):
+                shard_processed, shard_chunks, shard_batches = future.result()
+                processed_count += shard_processed
+                total_chunks += shard_chunks
+                batches += shard_batches
+                logger.info(f"Shard finished: {processed_count}/{len(files)} files indexed")
+        
+        return processed_count, total_chunks, batches
+    
+    def _iter_node_batches(
+        self,
+        files: List[str],
+        batch_size: int
+    ) -> Iterator[Tuple[int, List[BaseNode]]]:
+        """
+        Read and split files lazily, grouping their chunks into batches
+        
+        Args:
+            files: Paths to index
+            batch_size: Chunks per batch
+            
+        Yields:
+            (files processed so far, batch of chunks); the last batch may be
+            short or empty
+        """
+        batch: List[BaseNode] = []
+        processed_count = 0
+        
+        for file_path in files:
+            try:
+                documents = self._process_file(file_path)
+                batch.extend(self.node_parser.get_nodes_from_documents(documents))
+                processed_count += 1
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {str(e)}")
+                continue
+            
+            while len(batch) >= batch_size:
+                yield processed_count, batch[:batch_size]
+                batch = batch[batch_size:]
+        
+        yield processed_count, batch
+    
+    @staticmethod
+    def upsert_documents(documents: List[Document], batch_size: int = 1000) -> int:
+        """
+        Insert or update Document rows keyed on file_path
+        
+        Emits one multi-row INSERT ... ON CONFLICT DO UPDATE per batch
+        instead of a save() per row.
+        
+        Args:
+            documents: Unsaved Document instances
+            batch_size: Rows per statement
+            
+        Returns:
+            Number of rows written
+        """
+        return len(Document.objects.bulk_create(
+            documents,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['file_path'],
+            update_fields=['content', 'metadata', 'embedding', 'chunk_index', 'updated_at'],
+        ))
+    
+    def store_nodes(self, nodes: List[BaseNode]) -> None:
+        """
+        Embed a batch of nodes and write them to the vector store
+        
+        Args:
+            nodes: Parsed chunks without embeddings
+        """
+        embeddings = self.embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        )
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        
+        if self.use_postgres:
+            # One COPY per batch instead of an INSERT per chunk
+            VectorStoreProvider.bulk_insert_nodes(self.vector_store, nodes)
+        else:
+            self.vector_store.add(nodes, batch_size=VectorStoreConfig.REDIS_PIPELINE_BATCH_SIZE)
+    
     def _extract_files_from_tree(self, tree: Dict) -> List[str]:
         """Extract file paths from file tree"""
         files = []
@@ -300,3 +430,50 @@ class CodebaseIndexer:
             })
         
         return results
+    
+    def search_similar_documents_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once
+        
+        All queries are embedded in a single API call and looked up over
+        the same vector store connection (with a prepared statement on
+        PostgreSQL).
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            
+        Returns:
+            One list of similar documents per query, in order
+        """
+        embeddings = self.embed_model.get_text_embedding_batch(queries)
+        
+        if self.use_postgres:
+            query_results = VectorStoreProvider.knn_search(self.vector_store, embeddings, top_k=top_k)
+        else:
+            query_results = [
+                self.vector_store.query(VectorStoreQuery(query_embedding=embedding, similarity_top_k=top_k))
+                for embedding in embeddings
+            ]
+        
+        results = []
+        for result in query_results:
+            results.append([
+                {
+                    'text': node.get_content(),
+                    'metadata': node.metadata,
+                    'score': score,
+                }
+                for node, score in zip(result.nodes, result.similarities)
+            ])
+        
+        return results
+
+
+def _index_shard(files: List[str], use_postgres: bool, job_pk: Optional[Any] = None) -> Tuple[int, int, int]:
+    """Worker process entry point: index one shard with a fresh indexer"""
+    return CodebaseIndexer(use_postgres=use_postgres).index_files(files, shard_of_job=job_pk)
@@ -24,6 +24,7 @@ class ProjectAnalyzer:
     def __init__(self, root_path: str):
         self.root_path = Path(root_path).resolve()
         self.fs_visitor = FileSystemVisitor() # Your existing class
+        self.arch_visitor = ArchitectureVisitor()
         
     def analyze(self) -> Dict[str, Any]:
         logging.info(f"📂 Starting deep analysis at: {self.root_path}")
@@ -65,9 +66,10 @@ class ProjectAnalyzer:
                 with open(file_path, "r", encoding="utf-8") as f:
                     source_code = f.read()
                 
-                # Run Engine (Your ArchitectureVisitor)
-                tree = ast.parse(source_code)
-                visitor = ArchitectureVisitor()
+                # Run Engine (Your ArchitectureVisitor), reused across files
+                tree = ast.parse(source_code, type_comments=False)
+                visitor = self.arch_visitor
+                visitor.reset()
                 visitor.visit(tree)
                 
                 # Inject Analysis ONLY if significant logic is found
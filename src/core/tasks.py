@@ -98,8 +98,7 @@ def reindex_changed_files_task(file_paths: list, use_postgres: bool = True):
             documents.extend(docs)
         
         if documents:
-            index = indexer.get_index()
-            index.insert_nodes(indexer.node_parser.get_nodes_from_documents(documents))
+            indexer.store_nodes(indexer.node_parser.get_nodes_from_documents(documents))
         
         logger.info(f"Re-indexed {len(file_paths)} files with {len(documents)} chunks")
         return len(file_paths)
@@ -31,6 +31,38 @@ class ChatSessionAPITests(TestCase):
         response = self.client.get('/api/sessions/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 2)
+    
+    def test_update_session_reads_last_message_in_one_query(self):
+        """Test that updating a session doesn't query messages per field"""
+        from core.models import ChatSession, ChatMessage
+        
+        session = ChatSession.objects.create(title='Old')
+        ChatMessage.objects.create(session=session, role='user', content='Hello')
+        ChatMessage.objects.create(session=session, role='assistant', content='Hi there')
+        
+        # One SELECT with annotations, one UPDATE
+        with self.assertNumQueries(2):
+            response = self.client.patch(f'/api/sessions/{session.id}/', {'title': 'New'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message_count'], 2)
+        self.assertEqual(response.data['last_message']['content'], 'Hi there')
+    
+    def test_bulk_clear_history(self):
+        """Test clearing several sessions' history in one request"""
+        from core.models import ChatSession, ChatMessage
+        
+        sessions = [ChatSession.objects.create(title=f'Session {i}') for i in range(3)]
+        for session in sessions:
+            ChatMessage.objects.create(session=session, role='user', content='Hello')
+        
+        response = self.client.post('/api/sessions/bulk_clear/', {
+            'session_ids': [str(session.id) for session in sessions[:2]]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], 2)
+        self.assertEqual(ChatMessage.objects.get().session, sessions[2])
 
 
 class ChatAPITests(TestCase):
@@ -80,6 +112,31 @@ class ChatAPITests(TestCase):
         }, format='json')
         
         mock_service.assert_called_with(session_id=session_id)
+    
+    @patch('core.views.ChatbotService')
+    def test_chat_stream_sends_server_sent_events(self, mock_service):
+        """Test that streamed chat responses are framed as SSE events"""
+        session_id = str(uuid.uuid4())
+        message_id = str(uuid.uuid4())
+        
+        mock_instance = Mock()
+        mock_instance.chat_stream.return_value = iter([
+            {'delta': 'Hello'},
+            {'delta': ' world'},
+            {'done': True, 'sources': [], 'message_id': message_id},
+        ])
+        mock_service.return_value = mock_instance
+        
+        response = self.client.post('/api/chat/stream/', {
+            'message': 'Hi',
+            'session_id': session_id
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.split('\n\n')[:2], ['data: {"delta": "Hello"}', 'data: {"delta": " world"}'])
+        self.assertIn(f'"session_id": "{session_id}"', body)
 
 
 class IndexingAPITests(TestCase):
@@ -125,6 +182,62 @@ class IndexingAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class CodebaseIndexerTests(TestCase):
+    """Tests for CodebaseIndexer"""
+    
+    def test_node_batches_stream_across_files(self):
+        """Test that chunks are grouped into fixed-size batches as files are read"""
+        from core.services.indexing_service import CodebaseIndexer
+        
+        indexer = CodebaseIndexer.__new__(CodebaseIndexer)
+        indexer._process_file = lambda path: [path]
+        indexer.node_parser = Mock()
+        indexer.node_parser.get_nodes_from_documents.side_effect = lambda docs: [f'{docs[0]}:{i}' for i in range(3)]
+        
+        batches = list(indexer._iter_node_batches(['a.py', 'b.py', 'c.py'], batch_size=4))
+        
+        self.assertEqual([count for count, _ in batches], [2, 3, 3])
+        self.assertEqual([len(batch) for _, batch in batches], [4, 4, 1])
+    
+    def test_shards_add_progress_to_shared_job(self):
+        """Test that parallel shards report throttled progress into one job row as they go"""
+        from core.models import IndexingJob
+        from core.services.indexing_service import CodebaseIndexer
+        
+        job = IndexingJob.objects.create(status='running', total_files=5)
+        indexer = CodebaseIndexer.__new__(CodebaseIndexer)
+        indexer.PROGRESS_UPDATE_FILES = 1
+        indexer._process_file = lambda path: [path]
+        indexer.node_parser = Mock()
+        indexer.node_parser.get_nodes_from_documents.side_effect = lambda docs: docs
+        seen = []
+        indexer.store_nodes = lambda batch: seen.append(IndexingJob.objects.get(pk=job.pk).processed_files)
+        
+        with patch('core.services.indexing_service.LLMConfig.DEFAULT_EMBED_BATCH_SIZE', 1):
+            indexer.index_files(['a.py', 'b.py', 'c.py'], shard_of_job=job.pk)
+            indexer.index_files(['d.py', 'e.py'], shard_of_job=job.pk)
+        
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+        job.refresh_from_db()
+        self.assertEqual(job.processed_files, 5)
+
+
+    def test_upsert_documents_updates_existing_paths(self):
+        """Test that documents are upserted on file_path in bulk"""
+        from core.models import Document
+        from core.services.indexing_service import CodebaseIndexer
+        
+        Document.objects.create(file_path='/a.py', content='old')
+        
+        written = CodebaseIndexer.upsert_documents([
+            Document(file_path='/a.py', content='new'),
+            Document(file_path='/b.py', content='b'),
+        ])
+        
+        self.assertEqual(written, 2)
+        self.assertEqual(dict(Document.objects.values_list('file_path', 'content')), {'/a.py': 'new', '/b.py': 'b'})
+
+
 class SearchAPITests(TestCase):
     """Tests for search endpoints"""
     
@@ -152,6 +265,25 @@ class SearchAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
     
+    @patch('core.views.CodebaseIndexer')
+    def test_search_batch_returns_results_per_query(self, mock_indexer):
+        """Test that a batch of queries is answered with one result list per query"""
+        mock_instance = Mock()
+        mock_instance.search_similar_documents_batch.return_value = [
+            [{'text': 'def login():', 'metadata': {'file_name': 'auth.py'}, 'score': 0.9}],
+            [],
+        ]
+        mock_indexer.return_value = mock_instance
+        
+        response = self.client.post('/api/search/', {
+            'queries': ['login', 'logout'],
+            'top_k': 3
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([len(results) for results in response.data], [1, 0])
+        mock_instance.search_similar_documents_batch.assert_called_once_with(['login', 'logout'], top_k=3)
+    
     def test_search_requires_query(self):
         """Test that search requires a query parameter"""
         response = self.client.post('/api/search/', {}, format='json')
@@ -177,6 +309,52 @@ class LLMFactoryTests(TestCase):
         embeddings = LLMFactory.get_langchain_embeddings()
         self.assertIsNotNone(embeddings)
     
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_llm_instances_are_cached(self):
+        """Test that identical factory calls reuse the same client"""
+        from core.llm_factory.factory import LLMFactory
+        
+        llm = LLMFactory.get_langchain_llm(model='gpt-3.5-turbo')
+        self.assertIs(llm, LLMFactory.get_langchain_llm(model='gpt-3.5-turbo'))
+        self.assertIsNot(llm, LLMFactory.get_langchain_llm(model='gpt-4'))
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_llm_with_unhashable_kwargs_builds_uncached(self):
+        """Test that dict-valued kwargs such as model_kwargs still build a client"""
+        from core.llm_factory.factory import LLMFactory
+
+        llm = LLMFactory.get_langchain_llm(model='gpt-4', model_kwargs={'parallel_tool_calls': False})
+        self.assertEqual(llm.model_kwargs, {'parallel_tool_calls': False})
+        self.assertIsNot(llm, LLMFactory.get_langchain_llm(model='gpt-4', model_kwargs={'parallel_tool_calls': False}))
+
+    def test_fast_text_splitter_uses_config_defaults(self):
+        """Test that the shared splitter is built once with LLMConfig chunking"""
+        from core.llm_factory.factory import LLMFactory, LLMConfig
+        
+        splitter = LLMFactory.get_fast_text_splitter()
+        self.assertIs(splitter, LLMFactory.get_fast_text_splitter())
+        self.assertEqual(splitter.chunk_size, LLMConfig.DEFAULT_CHUNK_SIZE)
+        self.assertEqual(splitter.chunk_overlap, LLMConfig.DEFAULT_CHUNK_OVERLAP)
+    
+    @patch('core.llm_factory.factory.LLMFactory.get_langchain_embeddings')
+    def test_embed_texts_async_batches_requests(self, mock_get_embeddings):
+        """Test that texts are embedded in batches and keep their order"""
+        import asyncio
+        from core.llm_factory.factory import LLMFactory
+        
+        async def fake_embed(batch):
+            return [[float(len(text))] for text in batch]
+        
+        mock_embeddings = Mock()
+        mock_embeddings.aembed_documents.side_effect = fake_embed
+        mock_get_embeddings.return_value = mock_embeddings
+        
+        texts = ['a' * n for n in range(1, 6)]
+        vectors = asyncio.run(LLMFactory.embed_texts_async(texts, batch_size=2))
+        
+        self.assertEqual(vectors, [[1.0], [2.0], [3.0], [4.0], [5.0]])
+        self.assertEqual(mock_embeddings.aembed_documents.call_count, 3)
+    
     def test_missing_api_key_raises_error(self):
         """Test that missing API key raises error"""
         from core.llm_factory.factory import LLMFactory
@@ -194,6 +372,101 @@ class LLMFactoryTests(TestCase):
                 os.environ['OPENAI_API_KEY'] = original_key
 
 
+class VectorStoreProviderTests(TestCase):
+    """Tests for vector store helpers"""
+    
+    @patch('core.llm_factory.providers._use_json_vector_columns')
+    @patch('core.llm_factory.providers.PGVectorStore.from_params')
+    def test_postgres_vector_store_is_cached(self, mock_from_params, mock_use_json):
+        """Test that repeated provider calls reuse one store per table"""
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        mock_from_params.side_effect = lambda **kwargs: Mock()
+        
+        store = VectorStoreProvider.get_postgres_vector_store(table_name='cache_test')
+        self.assertIs(store, VectorStoreProvider.get_postgres_vector_store(table_name='cache_test'))
+        self.assertIsNot(store, VectorStoreProvider.get_postgres_vector_store(table_name='cache_test_2'))
+        self.assertEqual(mock_from_params.call_count, 2)
+    
+    @patch('core.llm_factory.providers._use_json_vector_columns')
+    @patch('core.llm_factory.providers.PGVectorStore.from_params')
+    def test_postgres_vector_store_defaults_to_fp32(self, mock_from_params, mock_use_json):
+        """Test that halfvec is opt-in, so existing FP32 tables keep working"""
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        mock_from_params.side_effect = lambda **kwargs: Mock()
+        
+        VectorStoreProvider.get_postgres_vector_store(table_name='fp32_default_test')
+        self.assertFalse(mock_from_params.call_args.kwargs['use_halfvec'])
+    
+    def test_postgres_vector_store_binds_json_and_checks_dimensions(self):
+        """Test that the store's embedding column encodes via JSON and rejects wrong sizes"""
+        from sqlalchemy.dialects import postgresql
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        store = VectorStoreProvider.get_postgres_vector_store(table_name='json_bind_test', embed_dim=3)
+        column_type = store._table_class.__table__.c.embedding.type
+        process = column_type.bind_processor(postgresql.dialect())
+        
+        self.assertEqual(process([0.5, 1, 2.25]), '[0.5, 1, 2.25]')
+        self.assertIsNone(process(None))
+        with self.assertRaises(ValueError):
+            process([0.5, 1])
+    
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    @patch('core.llm_factory.providers._use_json_vector_columns')
+    @patch('core.llm_factory.providers.PGVector')
+    def test_reset_embeddings_rebuilds_embeddings_and_stores(self, mock_pgvector, mock_use_json):
+        """Test that embeddings are shared until reset_embeddings() is called"""
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        mock_pgvector.side_effect = lambda **kwargs: Mock(embedding_function=kwargs['embedding_function'])
+        
+        store = VectorStoreProvider.get_langchain_postgres_store('reset_test')
+        self.assertIs(store, VectorStoreProvider.get_langchain_postgres_store('reset_test'))
+        
+        VectorStoreProvider.reset_embeddings()
+        rebuilt = VectorStoreProvider.get_langchain_postgres_store('reset_test')
+        self.assertIsNot(rebuilt, store)
+        self.assertIsNot(rebuilt.embedding_function, store.embedding_function)
+    
+    def test_hnsw_index_rebuilds_invalid_index(self):
+        """Test that an INVALID index left by a failed concurrent build is dropped, not kept"""
+        from types import SimpleNamespace
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        vector_store = MagicMock(use_halfvec=False)
+        vector_store._table_class.__table__ = SimpleNamespace(schema='public', name='data_embeddings')
+        connection = vector_store.client.connect.return_value.execution_options.return_value.__enter__.return_value
+        connection.exec_driver_sql.return_value.scalar.return_value = True
+        
+        self.assertEqual(VectorStoreProvider.create_hnsw_index(vector_store), 'data_embeddings_embedding_hnsw_idx')
+        statements = [call.args[0] for call in connection.exec_driver_sql.call_args_list]
+        drop = next(i for i, sql in enumerate(statements) if sql.startswith('DROP INDEX CONCURRENTLY'))
+        create = next(i for i, sql in enumerate(statements) if sql.startswith('CREATE INDEX CONCURRENTLY'))
+        self.assertLess(drop, create)
+    
+    @patch('core.llm_factory.providers.PostgresBulkWriter.MAX_PARAMETERS', 8)
+    def test_bulk_writer_splits_statements_at_parameter_limit(self):
+        """Test that a flush packs as many rows per INSERT as the limit allows"""
+        from types import SimpleNamespace
+        from llama_index.core.schema import TextNode
+        from core.llm_factory.providers import VectorStoreProvider
+        
+        vector_store = MagicMock(flat_metadata=False)
+        vector_store._table_class.__table__ = SimpleNamespace(schema='public', name='data_embeddings')
+        cursor = vector_store.client.raw_connection.return_value.cursor.return_value.__enter__.return_value
+        
+        writer = VectorStoreProvider.get_postgres_bulk_writer(vector_store, batch_size=10)
+        for i in range(5):
+            writer.add(TextNode(text=f'chunk {i}'), [float(i)])
+        
+        self.assertEqual(writer.flush(), 5)
+        inserts = [call for call in cursor.execute.call_args_list if len(call.args) > 1]
+        self.assertEqual([len(call.args[1]) for call in inserts], [8, 8, 4])
+        self.assertEqual(writer.flush(), 0)
+
+
 class ChatbotServiceTests(TestCase):
     """Tests for ChatbotService"""
     
@@ -205,6 +478,77 @@ class ChatbotServiceTests(TestCase):
         self.assertIsNotNone(session.id)
         self.assertEqual(session.title, 'Test Session')
     
+    def test_touch_session_updates_only_timestamp(self):
+        """Test that marking a session active doesn't rewrite other fields"""
+        from core.models import ChatSession
+        from core.services.chat_service import ChatbotService
+        
+        session = ChatbotService.create_session(title='Original')
+        ChatSession.objects.filter(pk=session.pk).update(title='Renamed')
+        
+        service = ChatbotService.__new__(ChatbotService)
+        service.session = session
+        service._touch_session()
+        
+        session_row = ChatSession.objects.get(pk=session.pk)
+        self.assertEqual(session_row.title, 'Renamed')
+        self.assertGreater(session_row.updated_at, session.updated_at)
+    
+    def test_history_returns_messages_in_order(self):
+        """Test that stored messages are returned in order with their sources"""
+        from core.models import ChatMessage
+        from core.services.chat_service import ChatbotService
+        
+        session = ChatbotService.create_session(title='History')
+        ChatMessage.objects.create(session=session, role='user', content='Hi')
+        ChatMessage.objects.create(session=session, role='assistant', content='Hello', sources=[{'file_name': 'a.py'}])
+        
+        service = ChatbotService.__new__(ChatbotService)
+        service.session = session
+        
+        history = service.get_history()
+        self.assertEqual([m['content'] for m in history], ['Hi', 'Hello'])
+        self.assertEqual([m['role'] for m in history], ['user', 'assistant'])
+        self.assertEqual(history[1]['sources'], [{'file_name': 'a.py'}])
+    
+    def test_chat_retrieves_once_for_answer_and_sources(self):
+        """Test that one retrieval feeds both the prompt and the sources"""
+        from langchain_core.documents import Document as LCDocument
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.runnables import RunnableLambda
+        from core.services.chat_service import ChatbotService
+        
+        retrieve = MagicMock(return_value=[LCDocument(page_content='def f(): pass', metadata={'file_name': 'f.py'})])
+        service = ChatbotService.__new__(ChatbotService)
+        service.session = ChatbotService.create_session(title='RAG')
+        service.session_id = str(service.session.id)
+        service.retriever = RunnableLambda(retrieve)
+        service.answer_chain, service.chain = ChatbotService._create_chains(
+            FakeListChatModel(responses=['It defines f.']), service.retriever
+        )
+        
+        response = service.chat('What is in f.py?')
+        
+        retrieve.assert_called_once_with('What is in f.py?')
+        self.assertEqual(response['message'], 'It defines f.')
+        self.assertEqual(response['sources'][0]['file_name'], 'f.py')
+        self.assertEqual(
+            [m['role'] for m in service.get_history()],
+            ['user', 'assistant']
+        )
+        self.assertEqual(service.get_history()[1]['id'], response['message_id'])
+    
+    def test_chains_are_shared_across_sessions(self):
+        """Test that services over the same clients reuse one retriever and chain"""
+        from core.services.chat_service import ChatbotService
+        
+        llm, vector_store = MagicMock(), MagicMock()
+        first = ChatbotService._shared_chains(llm, vector_store)
+        second = ChatbotService._shared_chains(llm, vector_store)
+        
+        self.assertIs(first[2], second[2])
+        vector_store.as_retriever.assert_called_once()
+    
     def test_list_sessions(self):
         """Test listing sessions"""
         from core.services.chat_service import ChatbotService
@@ -242,6 +586,19 @@ class ModelTests(TestCase):
         self.assertEqual(message.content, 'Hello')
         self.assertEqual(message.session, session)
     
+    def test_message_ids_are_time_ordered(self):
+        """Test that ChatMessage ids are version 7 UUIDs led by their creation time"""
+        import time
+        from core.models import ChatSession, ChatMessage
+        
+        session = ChatSession.objects.create(title='Test')
+        first = ChatMessage.objects.create(session=session, role='user', content='first')
+        time.sleep(0.002)
+        second = ChatMessage.objects.create(session=session, role='user', content='second')
+        
+        self.assertEqual((first.id.version, second.id.version), (7, 7))
+        self.assertLess(first.id, second.id)
+    
     def test_indexing_job_creation(self):
         """Test IndexingJob model"""
         from core.models import IndexingJob
@@ -249,3 +606,122 @@ class ModelTests(TestCase):
         job = IndexingJob.objects.create(status='pending')
         self.assertEqual(job.status, 'pending')
         self.assertEqual(job.total_files, 0)
+
+
+class ArchitectureVisitorTests(TestCase):
+    """Tests for the AST architecture visitor"""
+    
+    def test_destructured_assignments_infer_per_element(self):
+        """Test that unpacking pairs up element types instead of reusing the whole value's"""
+        import ast
+        from core.services.architecture_service import ArchitectureVisitor
+        
+        visitor = ArchitectureVisitor()
+        visitor.visit(ast.parse(
+            "class Point:\n"
+            "    def __init__(self):\n"
+            "        self.x, self.y = (10.0, 20.0)\n"
+            "        self.a, self.b = load()\n"
+            "        self.pair = (1, 2)\n"
+        ))
+        
+        types = {attr['name']: attr['type'] for attr in visitor.structure[0]['attributes']}
+        self.assertEqual(types, {'x': 'float', 'y': 'float', 'a': 'Unknown', 'b': 'Unknown', 'pair': 'tuple'})
+
+
+class DiscoveryToolsTests(TestCase):
+    """Tests for the fast file discovery helpers"""
+    
+    def setUp(self):
+        import os
+        import tempfile
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        env = patch.dict(os.environ, {'XDG_CACHE_HOME': os.path.join(self.tmp.name, 'cache')})
+        env.start()
+        self.addCleanup(env.stop)
+        # Fresh per-thread connection, opened under the patched cache home
+        self.addCleanup(self._close_cache)
+        self._close_cache()
+    
+    def _close_cache(self):
+        from core.services import discovery_tools
+        
+        db = getattr(discovery_tools._file_cache_local, 'db', None)
+        if db is not None:
+            db.close()
+            discovery_tools._file_cache_local.db = None
+    
+    def _write(self, relative_path, data):
+        import os
+        
+        path = os.path.join(self.tmp.name, 'src', relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_file_cache_lives_in_private_user_dir(self):
+        """Test that the metadata cache is kept under XDG_CACHE_HOME with owner-only access"""
+        import os
+        import stat
+        from core.services.discovery_tools import get_file_metadata
+        
+        get_file_metadata(self._write('a.py', b'import os\n'))
+        
+        cache_dir = os.path.join(self.tmp.name, 'cache', 'docai')
+        self.assertTrue(os.path.exists(os.path.join(cache_dir, 'filemeta.sqlite')))
+        self.assertEqual(stat.S_IMODE(os.stat(cache_dir).st_mode), 0o700)
+    
+    def test_file_metadata_cache_hit_and_invalidation(self):
+        """Test that cached metadata is reused until the file's mtime or size changes"""
+        import os
+        from core.services.discovery_tools import get_file_metadata
+        
+        path = self._write('a.py', b'import os\n')
+        first = get_file_metadata(path)
+        self.assertEqual(first['imports'], ['os'])
+        
+        # Same size and mtime: served from the cache, contents not re-read
+        mtime_ns = os.stat(path).st_mtime_ns
+        self._write('a.py', b'import re\n')
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(get_file_metadata(path), first)
+        
+        # mtime changed, same size
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertEqual(get_file_metadata(path)['imports'], ['re'])
+        
+        # size changed, same mtime
+        self._write('a.py', b'import sys\n')
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertEqual(get_file_metadata(path)['imports'], ['sys'])
+    
+    def test_latin1_source_is_scanned_as_bytes(self):
+        """Test that non-UTF-8 files are counted and their imports collected"""
+        from core.services.discovery_tools import _scan_source, get_file_metadata
+        
+        data = "# -*- coding: latin-1 -*-\nimport os\nclass Café:\n    s = 'é'\ndef àide():\n    pass\n".encode('latin-1')
+        
+        scan = _scan_source(data)
+        self.assertEqual((scan['lines'], scan['classes'], scan['functions']), (6, 1, 1))
+        self.assertEqual(scan['imports'], {'os'})
+        
+        metadata = get_file_metadata(self._write('legacy.py', data))
+        self.assertTrue(metadata['success'])
+        self.assertEqual(metadata['lines'], 6)
+        self.assertEqual(metadata['imports'], ['os'])
+    
+    def test_walk_skips_pruned_directories(self):
+        """Test that virtualenvs, caches and VCS directories are never descended into"""
+        import os
+        from core.services.discovery_tools import _walk_py
+        
+        for relative_path in ['main.py', 'pkg/mod.py', 'pkg/__pycache__/mod.py', '.venv/lib/site.py',
+                              'node_modules/pkg/x.py', '.git/hooks/hook.py', 'build/lib/mod.py']:
+            self._write(relative_path, b'')
+        
+        root = os.path.join(self.tmp.name, 'src')
+        found = sorted(os.path.relpath(entry.path, root) for entry in _walk_py(root))
+        self.assertEqual(found, ['main.py', os.path.join('pkg', 'mod.py')])
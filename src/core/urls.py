@@ -12,6 +12,7 @@ urlpatterns = [
     
     # Chat endpoints
     path('api/chat/', views.ChatView.as_view(), name='chat'),
+    path('api/chat/stream/', views.ChatStreamView.as_view(), name='chat_stream'),
     path('api/', include(router.urls)),
     
     # Indexing endpoints
@@ -1,27 +1,34 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.db import connection
+from django.db.models import Count, OuterRef, Subquery
 from django.conf import settings
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 import redis
 import uuid
+import json
 import os
+import logging
 
 from core.models import ChatSession, ChatMessage, IndexingJob
 from core.serializers import (
     ChatSessionSerializer, ChatSessionDetailSerializer,
     ChatMessageSerializer, ChatRequestSerializer, ChatResponseSerializer,
+    BulkClearRequestSerializer,
     IndexingJobSerializer, IndexingRequestSerializer,
     SearchRequestSerializer, SearchResultSerializer
 )
 from core.services.chat_service import ChatbotService
 from core.services.indexing_service import CodebaseIndexer
 
+logger = logging.getLogger(__name__)
+
 
 def health_check(request):
     """
@@ -84,6 +91,21 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
             return ChatSessionDetailSerializer
         return ChatSessionSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            return queryset.prefetch_related('messages')
+        if self.action in ('update', 'partial_update'):
+            # Everything ChatSessionSerializer reads, in the same query
+            latest = ChatMessage.objects.filter(session=OuterRef('pk')).order_by('-created_at')
+            return queryset.annotate(
+                message_count=Count('messages'),
+                last_message_content=Subquery(latest.values('content')[:1]),
+                last_message_role=Subquery(latest.values('role')[:1]),
+                last_message_created_at=Subquery(latest.values('created_at')[:1]),
+            )
+        return queryset
+    
     def list(self, request):
         """List all chat sessions"""
         sessions = ChatbotService.list_sessions()
@@ -99,20 +121,24 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['delete'])
     def clear_history(self, request, pk=None):
         """Clear chat history for a session"""
-        try:
-            chatbot = ChatbotService(session_id=pk)
-            chatbot.clear_history()
-            return Response({'message': 'Chat history cleared'})
-        except ChatSession.DoesNotExist:
-            return Response(
-                {'error': 'Session not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        session = self.get_object()
+        ChatbotService.clear_histories([session.id])
+        return Response({'message': 'Chat history cleared'})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_clear(self, request):
+        """Clear chat history for several sessions at once"""
+        serializer = BulkClearRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        deleted = ChatbotService.clear_histories(serializer.validated_data['session_ids'])
+        return Response({'message': 'Chat history cleared', 'deleted': deleted})
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ChatView(APIView):
     """View for handling chat messages"""
+    throttle_scope = 'chat'
     
     def post(self, request):
         """Send a message and get a response"""
@@ -145,6 +171,59 @@ class ChatView(APIView):
             )
 
 
+class EventStreamRenderer(BaseRenderer):
+    """Accept text/event-stream requests; non-streamed replies become one event"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f"data: {json.dumps(data)}\n\n".encode()
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ChatStreamView(APIView):
+    """View for streaming chat responses as server-sent events"""
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    throttle_scope = 'chat'
+    
+    def post(self, request):
+        """Send a message and stream the response tokens"""
+        serializer = ChatRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        message = serializer.validated_data['message']
+        session_id = serializer.validated_data.get('session_id')
+        
+        # Create new session if not provided
+        if not session_id:
+            session = ChatbotService.create_session()
+            session_id = session.id
+        session_id = str(session_id)
+        
+        try:
+            chatbot = ChatbotService(session_id=session_id)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        def events():
+            try:
+                for event in chatbot.chat_stream(message):
+                    if event.get('done'):
+                        event['session_id'] = session_id
+                    yield f"data: {json.dumps(event)}\n\n"
+            except Exception as e:
+                logger.error(f"Error streaming chat response: {str(e)}")
+                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+        return response
+
+
 def chatbot_ui(request):
     """Serve the chatbot UI interface"""
     return render(request, 'chatbot.html')
@@ -236,12 +315,19 @@ class SearchView(APIView):
         serializer = SearchRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        query = serializer.validated_data['query']
         top_k = serializer.validated_data['top_k']
         
         try:
             indexer = CodebaseIndexer(use_postgres=True)
-            results = indexer.search_similar_documents(query, top_k=top_k)
+            
+            # A batch gets one embedding call and one result list per query
+            if 'queries' in serializer.validated_data:
+                batches = indexer.search_similar_documents_batch(
+                    serializer.validated_data['queries'], top_k=top_k
+                )
+                return Response([SearchResultSerializer(results, many=True).data for results in batches])
+            
+            results = indexer.search_similar_documents(serializer.validated_data['query'], top_k=top_k)
             
             result_serializer = SearchResultSerializer(results, many=True)
             return Response(result_serializer.data)